@@ -1,12 +1,23 @@
+try:
+    # Install uvloop before anything binds the default event loop policy;
+    # optional since it doesn't build on Windows dev machines
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 import logging
 import os
-from flask import Flask
-import threading
 import re
 import json
-from datetime import datetime
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import IntEnum
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaDocument, InputMediaPhoto
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -17,37 +28,89 @@ from telegram.ext import (
     ConversationHandler,
 )
 from telegram.request import HTTPXRequest
-from mainapp.models import (
-    Candidate,
-    Order,
-    CandidateManager,
-    WorkExperience,
-    Education,
-    Skill,
-    CareerObjective,
-    CertificationAward,
-    Project,
-    Language,
-    OtherActivity,
-)
 import uuid
-import firebase_admin
-from firebase_admin import credentials, firestore
-import django
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 import asyncio
 import telegram
+from cachetools import TTLCache
 from translations import PROMPTS
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 
 # Ensure Python version is 3.6 or higher
 import sys
 if sys.version_info < (3, 6):
     raise RuntimeError("This bot requires Python 3.6 or higher")
 
-# Set up Django environment
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cvbot_backend.settings')
-django.setup()
+
+# Django, Firebase and the model layer pull in large dependency graphs;
+# they are loaded lazily by _ensure_backend() when the bot is constructed
+# so importing this module stays cheap on cold starts.
+_BACKEND_READY = False
+db = None
+firestore = None
+Candidate = Order = CandidateManager = None
+WorkExperience = Education = Skill = CareerObjective = None
+CertificationAward = Project = Language = OtherActivity = None
+commit_batch_with_retry = None
+BATCH_MAX_OPS = 450
+
+
+def _ensure_backend() -> None:
+    """Initialize Django, Firebase and the Firestore model layer on first use"""
+    global _BACKEND_READY, db, firestore
+    global Candidate, Order, CandidateManager, WorkExperience, Education, Skill
+    global CareerObjective, CertificationAward, Project, Language, OtherActivity
+    global commit_batch_with_retry, BATCH_MAX_OPS
+    if _BACKEND_READY:
+        return
+
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cvbot_backend.settings')
+    django.setup()
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    logger.info("Attempting to load Firebase credentials from GOOGLE_APPLICATION_CREDENTIALS")
+    try:
+        firebase_admin.get_app()
+    except ValueError:
+        credentials_json = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+        if not credentials_json:
+            raise ValueError("GOOGLE_APPLICATION_CREDENTIALS environment variable not set")
+        try:
+            cred_dict = json.loads(credentials_json)
+            cred = credentials.Certificate(cred_dict)
+            firebase_admin.initialize_app(cred)
+        except json.JSONDecodeError as e:
+            logger.error("Failed to parse GOOGLE_APPLICATION_CREDENTIALS JSON: %s", str(e))
+            raise
+        except Exception as e:
+            logger.error("Error initializing Firebase with credentials: %s", str(e))
+            raise
+    db = firestore.client()
+    logger.info("Firestore client obtained.")
+
+    from mainapp import models as _models
+    Candidate = _models.Candidate
+    Order = _models.Order
+    CandidateManager = _models.CandidateManager
+    WorkExperience = _models.WorkExperience
+    Education = _models.Education
+    Skill = _models.Skill
+    CareerObjective = _models.CareerObjective
+    CertificationAward = _models.CertificationAward
+    Project = _models.Project
+    Language = _models.Language
+    OtherActivity = _models.OtherActivity
+    commit_batch_with_retry = _models.commit_batch_with_retry
+    BATCH_MAX_OPS = _models.BATCH_MAX_OPS
+    _BACKEND_READY = True
 
 
 # Load environment variables
@@ -56,6 +119,9 @@ load_dotenv()
 # Get Telegram bot token and private channel ID
 telegram_bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
 private_channel_id = os.getenv('PRIVATE_CHANNEL_ID')
+# Parsed once: chat-id comparisons and filters want the int form, and the
+# channel-message path would otherwise re-parse the env string per update
+PRIVATE_CHANNEL_ID_INT = int(private_channel_id) if private_channel_id else 0
 tutorial_video_message_id = os.getenv('TUTORIAL_VIDEO_MESSAGE_ID')
 sample_cv_message_ids = os.getenv('SAMPLE_CV_MESSAGE_IDS', '').split(',') if os.getenv('SAMPLE_CV_MESSAGE_IDS') else []
 
@@ -63,31 +129,50 @@ tutorial_video_file_id = os.getenv('TUTORIAL_VIDEO_FILE_ID')
 tutorial_video_caption = os.getenv('TUTORIAL_VIDEO_CAPTION', '')
 sample_cv_file_ids = os.getenv('SAMPLE_CV_FILE_IDS', '').split(',') if os.getenv('SAMPLE_CV_FILE_IDS') else []
 sample_cv_captions = os.getenv('SAMPLE_CV_CAPTIONS', '').split(',') if os.getenv('SAMPLE_CV_CAPTIONS') else [''] * len(sample_cv_file_ids)
+# Per-file media type ('document' or 'photo'), so samples can be grouped
+# without probing each file_id against the API at send time
+sample_cv_types = os.getenv('SAMPLE_CV_TYPES', '').split(',') if os.getenv('SAMPLE_CV_TYPES') else ['document'] * len(sample_cv_file_ids)
+
+
+def _build_sample_media_groups() -> list:
+    """Pre-build sendMediaGroup payloads for the sample CVs.
+
+    One media-group call replaces a Telegram round-trip per file. Photos
+    and documents cannot share a group, so they are split here, and each
+    group is capped at Telegram's 10-item limit. sendMediaGroup also
+    refuses groups of fewer than 2 items, so send_sample_cvs dispatches
+    singleton buckets as plain sends.
+    """
+    documents, photos = [], []
+    for file_id, caption, media_type in zip(sample_cv_file_ids, sample_cv_captions, sample_cv_types):
+        file_id = file_id.strip()
+        if not file_id:
+            continue
+        bucket = photos if media_type.strip() == 'photo' else documents
+        media_cls = InputMediaPhoto if bucket is photos else InputMediaDocument
+        bucket.append(media_cls(
+            file_id,
+            caption=caption or None,
+            parse_mode='HTML' if caption else None
+        ))
+    groups = []
+    for bucket in (documents, photos):
+        for start in range(0, len(bucket), 10):
+            groups.append(bucket[start:start + 10])
+    return groups
+
+
+sample_cv_media_groups = _build_sample_media_groups()
+
+# Optional Redis-backed session persistence: sessions survive restarts
+# and memory stays bounded. Disabled unless SESSION_REDIS_URL is set.
+session_redis_url = os.getenv('SESSION_REDIS_URL')
+SESSION_TTL_SECONDS = int(os.getenv('SESSION_TTL_SECONDS', '86400'))
 
 
 # Add new conversation state (add this to the existing states tuple)
 
-# Initialize Firebase only if not already initialized
 logger = logging.getLogger(__name__)
-logger.info("Attempting to load Firebase credentials from GOOGLE_APPLICATION_CREDENTIALS")
-try:
-    firebase_admin.get_app()
-except ValueError:
-    credentials_json = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-    if not credentials_json:
-        raise ValueError("GOOGLE_APPLICATION_CREDENTIALS environment variable not set")
-    try:
-        cred_dict = json.loads(credentials_json)
-        cred = credentials.Certificate(cred_dict)
-        firebase_admin.initialize_app(cred)
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse GOOGLE_APPLICATION_CREDENTIALS JSON: {str(e)}")
-        raise
-    except Exception as e:
-        logger.error(f"Error initializing Firebase with credentials: {str(e)}")
-        raise
-db = firestore.client()
-logger.info("Firestore client obtained.")
 
 # Set up logging
 logging.basicConfig(
@@ -113,21 +198,333 @@ logging.basicConfig(
     PAYMENT
 ) = range(15)
 
+# Callback-data patterns, compiled once at module load so dispatch does not
+# recompile/re-lookup them on every button press
+_P_LANG = re.compile(r"^lang_", re.ASCII)
+_P_CONTINUE_PROFESSIONAL = re.compile(r"^continue_professional$", re.ASCII)
+_P_WORK_CHOICE = re.compile(r"^(add_another_work|continue_education)$", re.ASCII)
+_P_EDU_CHOICE = re.compile(r"^(add_another_edu|continue_skills)$", re.ASCII)
+_P_SKILL_CHOICE = re.compile(r"^(add_another_skill|continue_career)$", re.ASCII)
+_P_CERT_CHOICE = re.compile(r"^(add_another_cert|continue_projects)$", re.ASCII)
+_P_PROJECT_CHOICE = re.compile(r"^(add_another_project|continue_languages)$", re.ASCII)
+_P_LANGUAGE_CHOICE = re.compile(r"^(add_another_language|continue_activities)$", re.ASCII)
+_P_CONFIRM = re.compile(r"^confirm_", re.ASCII)
+_P_EDIT = re.compile(r"^edit_", re.ASCII)
+
+# Handler filters built once and shared across states. PTB evaluates each
+# sub-filter of a composite per update, so the photo/image/PDF chain is
+# collapsed into a single Python-level probe.
+_ALLOWED_MIMES = frozenset({'application/pdf'})
+
+
+class _MediaFilter(filters.MessageFilter):
+    """Matches a photo, image document, or PDF with one branch"""
+
+    def filter(self, message) -> bool:
+        if message.photo:
+            return True
+        document = message.document
+        if document is None:
+            return False
+        mime_type = document.mime_type or ''
+        return mime_type in _ALLOWED_MIMES or mime_type.startswith('image/')
+
+
+TEXT_NOCMD = filters.TEXT & ~filters.COMMAND
+# C-level tuple startswith beats a compiled regex for short prefixes, and
+# admin panels can generate bursts of these presses
+_ADMIN_ACTION_PREFIXES = ('approve_', 'reject_')
+
+# Table-driven steps for the plain "store the text, ask for the next
+# field" parts of the conversation. Each entry maps
+# current_field -> (next_field, next_prompt_key, next_state, skippable);
+# one lookup replaces the if/elif ladder per message. Steps with extra
+# behaviour (media handling, list appends) stay as explicit handlers.
+FIELD_FSM = {
+    'firstName': ('middleName', 'middle_name', COLLECT_PERSONAL_INFO, False),
+    'middleName': ('lastName', 'last_name', COLLECT_PERSONAL_INFO, False),
+    'lastName': ('phoneNumber', 'phone_number', COLLECT_CONTACT_INFO, False),
+    'phoneNumber': ('emailAddress', 'email_address', COLLECT_CONTACT_INFO, False),
+    'emailAddress': ('linkedinProfile', 'linkedin_profile', COLLECT_CONTACT_INFO, False),
+    'linkedinProfile': ('city', 'city', COLLECT_CONTACT_INFO, True),
+    'city': ('country', 'country', COLLECT_CONTACT_INFO, False),
+    'country': (None, 'profile_image_prompt', COLLECT_PROFILE_IMAGE, False),
+}
+
+
+def _is_skip(text) -> bool:
+    """True when the message is the literal skip keyword.
+
+    The length gate avoids lowercasing long descriptions just to rule
+    them out.
+    """
+    return text is not None and len(text) == 4 and text.lower() == 'skip'
+
+
+def _make_step(data_key, next_field, next_prompt_key, next_state, skippable):
+    """Specialize one FIELD_FSM row into a closure.
+
+    The skip check is resolved at build time, so non-skippable fields
+    (all but one) never run the lower()/compare on the hot path.
+    """
+    if skippable:
+        def step(session, text):
+            session.candidate_data[data_key] = None if _is_skip(text) else text
+            session.current_field = next_field
+            return next_prompt_key, next_state
+    else:
+        def step(session, text):
+            session.candidate_data[data_key] = text
+            session.current_field = next_field
+            return next_prompt_key, next_state
+    return step
+
+
+FIELD_DISPATCH = {field: _make_step(field, *spec) for field, spec in FIELD_FSM.items()}
+
+# edit_info dispatch: callback data -> (list attribute to clear,
+# current_field to set, in-progress dict attribute to clear, prompt key,
+# next conversation state). _KEEP leaves current_field untouched for the
+# sections that never read it.
+_KEEP = object()
+EDIT_DISPATCH = {
+    'edit_personal': (None, 'firstName', None, 'first_name', COLLECT_PERSONAL_INFO),
+    'edit_contact': (None, 'phoneNumber', None, 'phone_number', COLLECT_CONTACT_INFO),
+    'edit_profile_image': (None, None, None, 'profile_image_prompt', COLLECT_PROFILE_IMAGE),
+    'edit_work': ('workExperiences', 'work_jobTitle', None, 'job_title', COLLECT_PROFESSIONAL_INFO),
+    'edit_education': ('education', 'edu_degreeName', 'current_education', 'degree_name', COLLECT_EDUCATION),
+    'edit_skills': ('skills', 'skill_skillName', 'current_skill', 'skill_name', COLLECT_SKILLS),
+    'edit_career': ('careerObjectives', _KEEP, None, 'career_summary', COLLECT_CAREER_OBJECTIVE),
+    'edit_certs': ('certificationsAwards', 'cert_certificateName', 'current_certification', 'certificate_name', COLLECT_CERTIFICATIONS),
+    'edit_projects': ('projects', 'project_projectTitle', 'current_project', 'project_title', COLLECT_PROJECTS),
+    'edit_languages': ('languages', 'lang_languageName', 'current_language', 'language_name', COLLECT_LANGUAGES),
+    'edit_activities': ('otherActivities', _KEEP, None, 'activities', COLLECT_ACTIVITIES),
+}
+MEDIA_ONLY = _MediaFilter(name='cvmaker.media')
+MEDIA_OR_TEXT = MEDIA_ONLY | filters.TEXT
+
+
+class PaymentPhase(IntEnum):
+    """Where a session sits in the payment flow.
+
+    One value replaces the old notified/from_main_flow flag pair;
+    phases >= APPROVED mean the user has been told the outcome.
+    """
+    INITIAL = 0
+    RETRY = 1
+    APPROVED = 2
+    REJECTED = 3
+
+
+@dataclass(slots=True)
+class UserSession:
+    """Per-user conversation state.
+
+    Slotted so thousands of concurrent sessions don't each carry a full
+    instance __dict__. The mapping-style helpers below keep dict-like
+    access (get/in/del) working for fields that are only set part-way
+    through the conversation.
+    """
+    language: str = 'en'
+    # Direct reference to this user's prompt table so get_prompt is a
+    # single dict lookup instead of two
+    prompts: dict = field(default_factory=lambda: PROMPTS['en'])
+    chat_id: int = None
+    candidate_data: dict = field(default_factory=lambda: {'availability': 'To be specified'})
+    careerObjectives: list = field(default_factory=list)
+    skills: list = field(default_factory=list)
+    education: list = field(default_factory=list)
+    languages: list = field(default_factory=list)
+    workExperiences: list = field(default_factory=list)
+    certificationsAwards: list = field(default_factory=list)
+    otherActivities: list = field(default_factory=list)
+    projects: list = field(default_factory=list)
+    current_field: str = None
+    current_work_experience: dict = field(default_factory=dict)
+    current_education: dict = field(default_factory=dict)
+    current_skill: dict = field(default_factory=dict)
+    current_certification: dict = field(default_factory=dict)
+    current_project: dict = field(default_factory=dict)
+    current_language: dict = field(default_factory=dict)
+    menu_message_id: int = None
+    summary_message_id: int = None
+    saving_message_id: int = None
+    order_id: str = None
+    payment_phase: int = PaymentPhase.INITIAL
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        setattr(self, key, None)
+
+    def __contains__(self, key):
+        return getattr(self, key, None) is not None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def pop(self, key, default=None):
+        value = getattr(self, key, None)
+        setattr(self, key, None)
+        return default if value is None else value
+
+    def reset(self, language: str = 'en', chat_id: int = None, current_field: str = None) -> 'UserSession':
+        """Clear all state in place so the instance (and its list backing
+        arrays) can be reused instead of reallocated"""
+        self.language = language
+        self.prompts = PROMPTS[language]
+        self.chat_id = chat_id
+        self.candidate_data = {'availability': 'To be specified'}
+        for collection in (self.careerObjectives, self.skills, self.education,
+                           self.languages, self.workExperiences, self.certificationsAwards,
+                           self.otherActivities, self.projects):
+            collection.clear()
+        self.current_field = current_field
+        self.current_work_experience.clear()
+        self.current_education.clear()
+        self.current_skill.clear()
+        self.current_certification.clear()
+        self.current_project.clear()
+        self.current_language.clear()
+        self.menu_message_id = None
+        self.summary_message_id = None
+        self.saving_message_id = None
+        self.order_id = None
+        self.payment_phase = PaymentPhase.INITIAL
+        return self
+
+    # Everything except the prompt-table reference, which is rebuilt from
+    # the language on restore
+    _PERSISTED_FIELDS = (
+        'language', 'chat_id', 'candidate_data', 'careerObjectives', 'skills',
+        'education', 'languages', 'workExperiences', 'certificationsAwards',
+        'otherActivities', 'projects', 'current_field',
+        'current_work_experience', 'current_education', 'current_skill',
+        'current_certification', 'current_project', 'current_language',
+        'menu_message_id', 'summary_message_id', 'saving_message_id',
+        'order_id', 'payment_phase',
+    )
+
+    def to_payload(self) -> dict:
+        """Serialize the session for the external store"""
+        return {name: getattr(self, name) for name in self._PERSISTED_FIELDS}
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> 'UserSession':
+        """Rebuild a session from a stored payload"""
+        session = cls(**{name: payload[name] for name in cls._PERSISTED_FIELDS if name in payload})
+        session.prompts = PROMPTS.get(session.language, PROMPTS['en'])
+        return session
+
+@dataclass(slots=True)
+class SendJob:
+    """One queued outbound Telegram call awaiting dispatch.
+
+    Plain sends carry their kwargs; edits carry only the (chat_id,
+    message_id) key and fetch the newest payload at dispatch time so
+    superseded edits are dropped instead of sent.
+    """
+    kwargs: dict
+    edit_key: tuple = None
+
+
 class CVBot:
+    # Upload validation constants; frozensets give O(1) membership and the
+    # limits aren't recomputed per message
+    _ALLOWED_MIME = frozenset({'image/jpeg', 'image/png', 'application/pdf'})
+    _ALLOWED_EXT = frozenset({'jpg', 'jpeg', 'png', 'pdf'})
+    _MAX_FILE_SIZE = 5 * 1024 * 1024
+
     def __init__(self, token: str):
-        # Configure HTTPXRequest with supported parameters
+        _ensure_backend()
+        # A 10-connection pool serialized bursts of sends behind a handful
+        # of HTTP/1.1 sockets; HTTP/2 multiplexes streams per connection
+        # and the larger pool absorbs button-press spikes
         request = HTTPXRequest(
-            connection_pool_size=10,
-            connect_timeout=60.0,
-            read_timeout=60.0,
-            write_timeout=60.0
+            connection_pool_size=100,
+            http_version="2.0",
+            connect_timeout=10.0,
+            read_timeout=20.0,
+            write_timeout=20.0,
+            pool_timeout=5.0
         )
         logger.info("Initializing Application with token")
-        self.application = Application.builder().token(token).request(request).post_init(self.post_init).build()
-        self.user_sessions: Dict[str, Dict] = {}  # Dictionary to store user-specific data
-        self.user_cache: Dict[str, int] = {}  # Cache for username to user_id mapping
+        # Process updates concurrently so a slow profile fetch in one chat
+        # doesn't head-of-line block every other chat's callbacks
+        self.application = (
+            Application.builder()
+            .token(token)
+            .request(request)
+            .post_init(self.post_init)
+            .concurrent_updates(256)
+            .build()
+        )
+        # Bounded session store: abandoned sessions age out after an hour
+        # instead of pinning full CV data forever. Active conversations are
+        # recoverable from Redis (when configured) if their entry expires.
+        self.user_sessions: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+        # LRU-bounded cache for username to user_id mapping; without a cap
+        # this grows by one entry per user forever
+        # Built lazily, one immutable markup per language
+        self._sections_kb_cache: Dict[str, InlineKeyboardMarkup] = {}
+        # Two-button add-another/continue markups keyed by (language, section)
+        self._choice_kb_cache: Dict[tuple, InlineKeyboardMarkup] = {}
+        self._continue_prof_kb_cache: Dict[str, InlineKeyboardMarkup] = {}
+        self._confirm_kb_cache: Dict[str, InlineKeyboardMarkup] = {}
+        self.user_cache: OrderedDict[str, int] = OrderedDict()
+        self._user_cache_max = 50_000
+        # Usernames that recently failed all three resolve attempts; fail
+        # fast instead of re-issuing the API calls for the TTL window
+        self._neg_cache: Dict[str, float] = {}
+        self._neg_cache_ttl = 3600.0
+        # Shared executor for Firestore work so concurrent fetches don't
+        # spin up a new thread pool per call
+        self.db_executor = ThreadPoolExecutor(max_workers=8)
+        # Fire-and-forget sends go through one queue so dispatch respects
+        # Telegram's global ~30 msg/s limit instead of each handler racing
+        self._send_queue: asyncio.Queue = asyncio.Queue(maxsize=10_000)
+        # 28 leaves slack under the 30 msg/s global cap
+        self._send_semaphore = asyncio.Semaphore(28)
+        self._send_worker_task = None
+        # Newest pending edit per (chat_id, message_id); older queued edits
+        # of the same message are dropped at dispatch
+        self._pending_edits: Dict[tuple, dict] = {}
+        # Optional Redis session store, connected in start_background_tasks
+        self._redis = None
+        # Sessions touched since the last write-behind flush
+        self._dirty: set = set()
+        self._flush_task = None
+        self._gauge_task = None
+        self._health_task = None
+        # One immutable main-menu markup per language, shared by every user
+        # instead of rebuilding three buttons per menu render
+        self._main_menu_markup = {
+            lang: InlineKeyboardMarkup([
+                [InlineKeyboardButton(PROMPTS[lang]['create_new_cv'], callback_data="new_cv")],
+                [InlineKeyboardButton(PROMPTS[lang]['guide_video'], callback_data="guide_video")],
+                [InlineKeyboardButton(PROMPTS[lang]['samples'], callback_data="samples")]
+            ])
+            for lang in PROMPTS
+        }
 
 
+        # Menu dispatch for the START state: one dict lookup per button press
+        # instead of a regex match per registered handler
+        self._start_cb_dispatch = {
+            'update_profile': self.start_collecting_info,
+            'new_cv': self.start_collecting_info,
+            'guide_video': self.handle_returning_user_choice,
+            'samples': self.handle_returning_user_choice,
+        }
+
         logger.info("🔄 Initializing CVBot instance")
         logger.info("🔄 Building Application instance")
         logger.info("🔄 Setting up handlers")
@@ -145,65 +542,64 @@ class CVBot:
             entry_points=[CommandHandler("start", self.start)],
             states={
                 SELECT_LANGUAGE: [
-                    CallbackQueryHandler(self.select_language, pattern="^lang_")
+                    CallbackQueryHandler(self.select_language, pattern=_P_LANG)
                 ],
 
                 START: [
-                    MessageHandler(filters.TEXT & ~filters.COMMAND, self.start_collecting_info),
-                    CallbackQueryHandler(self.start_collecting_info, pattern="^(update_profile|new_cv)$"),
-                    CallbackQueryHandler(self.handle_returning_user_choice, pattern="^(new_cv|guide_video|samples)$")
+                    MessageHandler(TEXT_NOCMD, self.start_collecting_info),
+                    CallbackQueryHandler(self._dispatch_start_callback)
                 ],
 
                 COLLECT_PERSONAL_INFO: [
-                    MessageHandler(filters.TEXT & ~filters.COMMAND, self.collect_personal_info)
+                    MessageHandler(TEXT_NOCMD, self.collect_candidate_field)
                 ],
                 COLLECT_CONTACT_INFO: [
-                    MessageHandler(filters.TEXT & ~filters.COMMAND, self.collect_contact_info)
+                    MessageHandler(TEXT_NOCMD, self.collect_candidate_field)
                 ],
                 COLLECT_PROFILE_IMAGE: [
                     MessageHandler(
-                        filters.PHOTO | filters.Document.IMAGE | filters.Document.MimeType("application/pdf") | filters.TEXT,
+                        MEDIA_OR_TEXT,
                         self.collect_profile_image
                     ),
-                    CallbackQueryHandler(self.handle_profile_image_choice, pattern="^continue_professional$")
+                    CallbackQueryHandler(self.handle_profile_image_choice, pattern=_P_CONTINUE_PROFESSIONAL)
                 ],
                 COLLECT_PROFESSIONAL_INFO: [
-                    MessageHandler(filters.TEXT & ~filters.COMMAND, self.collect_professional_info),
-                    CallbackQueryHandler(self.handle_professional_info_choice, pattern="^(add_another_work|continue_education)$")
+                    MessageHandler(TEXT_NOCMD, self.collect_professional_info),
+                    CallbackQueryHandler(self.handle_professional_info_choice, pattern=_P_WORK_CHOICE)
                 ],
                 COLLECT_EDUCATION: [
-                    MessageHandler(filters.TEXT & ~filters.COMMAND, self.collect_education),
-                    CallbackQueryHandler(self.handle_education_choice, pattern="^(add_another_edu|continue_skills)$")
+                    MessageHandler(TEXT_NOCMD, self.collect_education),
+                    CallbackQueryHandler(self.handle_education_choice, pattern=_P_EDU_CHOICE)
                 ],
                 COLLECT_SKILLS: [
-                    MessageHandler(filters.TEXT & ~filters.COMMAND, self.collect_skills),
-                    CallbackQueryHandler(self.handle_skills_choice, pattern="^(add_another_skill|continue_career)$")
+                    MessageHandler(TEXT_NOCMD, self.collect_skills),
+                    CallbackQueryHandler(self.handle_skills_choice, pattern=_P_SKILL_CHOICE)
                 ],
                 COLLECT_CAREER_OBJECTIVE: [
-                    MessageHandler(filters.TEXT & ~filters.COMMAND, self.collect_career_objective)
+                    MessageHandler(TEXT_NOCMD, self.collect_career_objective)
                 ],
                 COLLECT_CERTIFICATIONS: [
-                    MessageHandler(filters.TEXT & ~filters.COMMAND, self.collect_certifications),
-                    CallbackQueryHandler(self.handle_certifications_choice, pattern="^(add_another_cert|continue_projects)$")
+                    MessageHandler(TEXT_NOCMD, self.collect_certifications),
+                    CallbackQueryHandler(self.handle_certifications_choice, pattern=_P_CERT_CHOICE)
                 ],
                 COLLECT_PROJECTS: [
-                    MessageHandler(filters.TEXT & ~filters.COMMAND, self.collect_projects),
-                    CallbackQueryHandler(self.handle_projects_choice, pattern="^(add_another_project|continue_languages)$")
+                    MessageHandler(TEXT_NOCMD, self.collect_projects),
+                    CallbackQueryHandler(self.handle_projects_choice, pattern=_P_PROJECT_CHOICE)
                 ],
                 COLLECT_LANGUAGES: [
-                    MessageHandler(filters.TEXT & ~filters.COMMAND, self.collect_languages),
-                    CallbackQueryHandler(self.handle_languages_choice, pattern="^(add_another_language|continue_activities)$")
+                    MessageHandler(TEXT_NOCMD, self.collect_languages),
+                    CallbackQueryHandler(self.handle_languages_choice, pattern=_P_LANGUAGE_CHOICE)
                 ],
                 COLLECT_ACTIVITIES: [
-                    MessageHandler(filters.TEXT & ~filters.COMMAND, self.collect_activities)
+                    MessageHandler(TEXT_NOCMD, self.collect_activities)
                 ],
                 CONFIRM_ORDER: [
-                    CallbackQueryHandler(self.confirm_order, pattern="^confirm_"),
-                    CallbackQueryHandler(self.edit_info, pattern="^edit_")
+                    CallbackQueryHandler(self.confirm_order, pattern=_P_CONFIRM),
+                    CallbackQueryHandler(self.edit_info, pattern=_P_EDIT)
                 ],
                 PAYMENT: [
                     MessageHandler(
-                        filters.PHOTO | filters.Document.IMAGE | filters.Document.MimeType("application/pdf"),
+                        MEDIA_ONLY,
                         self.handle_payment_screenshot
                     )
                 ]
@@ -217,7 +613,7 @@ class CVBot:
         states={
             PAYMENT: [
                 MessageHandler(
-                    filters.PHOTO | filters.Document.IMAGE | filters.Document.MimeType("application/pdf"),
+                    MEDIA_ONLY,
                     self.handle_payment_screenshot
                 )
             ]
@@ -229,9 +625,9 @@ class CVBot:
         self.application.add_handler(conv_handler)
         self.application.add_handler(payment_retry_handler)
         self.application.add_handler(CommandHandler("help", self.help_command))
-        self.application.add_handler(CallbackQueryHandler(self.handle_admin_response, pattern="^(approve_|reject_)"))
-        self.application.add_handler(MessageHandler(filters.Chat(int(private_channel_id)) & filters.REPLY, self.handle_admin_reply))
-        self.application.add_handler(MessageHandler(filters.Chat(int(private_channel_id)) & ~filters.REPLY & ~(filters.PHOTO | filters.Document.ALL), self.ignore_non_reply_messages))
+        self.application.add_handler(CallbackQueryHandler(self.handle_admin_response, pattern=lambda data: data.startswith(_ADMIN_ACTION_PREFIXES)))
+        self.application.add_handler(MessageHandler(filters.Chat(PRIVATE_CHANNEL_ID_INT) & filters.REPLY, self.handle_admin_reply))
+        self.application.add_handler(MessageHandler(filters.Chat(PRIVATE_CHANNEL_ID_INT) & ~filters.REPLY & ~(filters.PHOTO | filters.Document.ALL), self.ignore_non_reply_messages))
         self.application.add_handler(MessageHandler(filters.ChatType.PRIVATE, self.cache_user_info))
         self.application.add_error_handler(self.error_handler)
 
@@ -239,140 +635,397 @@ class CVBot:
 
     async def log_file_id(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Temporary handler to log file_id of uploaded media"""
-        if update.message and update.message.chat_id == int(private_channel_id):
+        if update.message and update.message.chat_id == PRIVATE_CHANNEL_ID_INT:
             if update.message.video:
-                logger.info(f"Video file_id: {update.message.video.file_id}")
+                logger.info("Video file_id: %s", update.message.video.file_id)
             elif update.message.document:
-                logger.info(f"Document file_id: {update.message.document.file_id}")
+                logger.info("Document file_id: %s", update.message.document.file_id)
     def start_background_tasks(self) -> None:
-        """Start background tasks for polling order status changes"""
-        self.application.create_task(self.poll_order_status_changes())
+        """Register the Firestore listener for order status changes"""
+        self._main_loop = asyncio.get_running_loop()
+        # Bound the watched set server-side: without the cutoff the watch
+        # replays every historical verified/rejected order as ADDED on
+        # startup and keeps them all resident for the life of the process.
+        # The one-hour lookback still catches transitions made while the
+        # bot was briefly down (restored sessions keep order_id and phase).
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=1)
+        query = (db.collection('orders')
+                 .where('status', 'in', ['verified', 'rejected'])
+                 .where('lastStatusUpdate', '>=', cutoff))
+        self._order_watch = query.on_snapshot(self._on_order_status_change)
+        logger.info("Registered Firestore on_snapshot listener for order status changes")
+        self._send_worker_task = self._main_loop.create_task(self._send_worker())
+        logger.info("Started outbound send worker")
+        if session_redis_url and msgpack is not None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(session_redis_url)
+            self._flush_task = self._main_loop.create_task(self._flush_loop())
+            logger.info("Connected session store to Redis")
+        self._gauge_task = self._main_loop.create_task(self._session_gauge_loop())
+        self._health_task = self._main_loop.create_task(self._start_health_server())
+
+    async def _start_health_server(self) -> None:
+        """Serve the keepalive endpoint from the bot's own event loop.
+
+        A raw asyncio server replaces the old Flask thread: no Werkzeug,
+        no extra OS thread contending for the GIL.
+        """
+        async def _health(reader, writer):
+            try:
+                await reader.read(1024)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 13\r\n\r\nBot is alive!")
+                await writer.drain()
+            finally:
+                writer.close()
+
+        port = int(os.environ.get("PORT", 5000))
+        await asyncio.start_server(_health, "0.0.0.0", port)
+        logger.info("Health endpoint listening on port %s", port)
+
+    async def _session_gauge_loop(self) -> None:
+        """Log the in-memory session count so the TTLCache cap can be tuned"""
+        while True:
+            await asyncio.sleep(300)
+            logger.info("📈 In-memory sessions: %s/%s", len(self.user_sessions), self.user_sessions.maxsize)
 
-    async def poll_order_status_changes(self) -> None:
-        """Poll Firestore for order status changes and send notifications"""
+    def queue_message(self, **kwargs) -> None:
+        """Queue a fire-and-forget outbound message for batched dispatch"""
+        try:
+            self._send_queue.put_nowait(SendJob(kwargs))
+        except asyncio.QueueFull:
+            logger.warning("Outbound send queue full; dropping message to chat_id %s", kwargs.get('chat_id'))
+
+    async def _send_worker(self) -> None:
+        """Drain the outbound queue in ~50 ms batches.
+
+        Accumulating briefly lets bursts of button presses dispatch as one
+        gather instead of independent posts, while the semaphore keeps the
+        in-flight count under Telegram's global rate cap.
+        """
+        loop = asyncio.get_running_loop()
         while True:
+            batch = [await self._send_queue.get()]
+            deadline = loop.time() + 0.05
+            while len(batch) < 30:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._send_queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await asyncio.gather(*(self._dispatch_send(job) for job in batch))
+
+    def queue_edit(self, query, text: str, **kwargs) -> None:
+        """Queue a message edit, coalescing with any pending edit of the
+        same message so only the newest text goes out"""
+        key = (query.message.chat_id, query.message.message_id)
+        already_pending = key in self._pending_edits
+        self._pending_edits[key] = {
+            'chat_id': key[0],
+            'message_id': key[1],
+            'text': text,
+            **kwargs,
+        }
+        if not already_pending:
             try:
-                for telegram_id, session in list(self.user_sessions.items()):
-                    if 'order_id' not in session or 'chat_id' not in session:
-                        logger.debug(f"Skipping session for telegram_id {telegram_id}: missing order_id or chat_id")
-                        continue
-                    order = Order.get_by_id(session['order_id'])
-                    if not order:
-                        logger.debug(f"Order {session['order_id']} not found for telegram_id {telegram_id}")
-                        continue
-                    if order.status in ['verified', 'rejected'] and not session.get('notified', False):
-                        if order.status == 'verified':
-                            await self.application.bot.send_message(
-                                chat_id=session['chat_id'],
-                                text=self.get_prompt(session, 'payment_verified')
-                            )
-                            logger.info(f"Sent payment verified notification to chat_id {session['chat_id']} for order {session['order_id']}")
-                        elif order.status == 'rejected':
-                            reason = order.statusDetails or "No reason provided"
-                            await self.application.bot.send_message(
-                                chat_id=session['chat_id'],
-                                text=self.get_prompt(session, 'payment_rejected').format(reason=reason)
-                            )
-                            logger.info(f"Sent payment rejected notification to chat_id {session['chat_id']} for order {session['order_id']}")
-                        session['notified'] = True
-            except Exception as e:
-                logger.error(f"Error in poll_order_status_changes: {str(e)}")
-            await asyncio.sleep(300)  # Poll every 5 minutes
+                self._send_queue.put_nowait(SendJob(kwargs={}, edit_key=key))
+            except asyncio.QueueFull:
+                del self._pending_edits[key]
+                logger.warning("Outbound send queue full; dropping edit for message %s", key)
+
+    async def _dispatch_send(self, job: SendJob) -> None:
+        if job.edit_key is not None:
+            payload = self._pending_edits.pop(job.edit_key, None)
+            if payload is None:
+                # A newer edit for this message already went out
+                return
+        async with self._send_semaphore:
+            for attempt in (0, 1):
+                try:
+                    if job.edit_key is not None:
+                        await self.application.bot.edit_message_text(**payload)
+                    else:
+                        await self.application.bot.send_message(**job.kwargs)
+                    return
+                except telegram.error.RetryAfter as e:
+                    if attempt:
+                        logger.error("Queued call still rate-limited after waiting %ss", e.retry_after)
+                        return
+                    await asyncio.sleep(e.retry_after)
+                except Exception as e:
+                    target = job.edit_key or job.kwargs.get('chat_id')
+                    logger.error("Queued Telegram call for %s failed: %s", target, str(e))
+                    return
+
+    def _on_order_status_change(self, col_snapshot, changes, read_time) -> None:
+        """Handle pushed order status changes (runs on the Firestore listener thread)"""
+        try:
+            for change in changes:
+                if change.type.name not in ('ADDED', 'MODIFIED'):
+                    continue
+                order_data = change.document.to_dict() or {}
+                telegram_id = order_data.get('telegramUserId')
+                if not telegram_id:
+                    continue
+                # The session cache is only safe to touch on the loop thread
+                # (TTLCache mutates internal state even on reads), so hand
+                # plain ids across and look the session up in the coroutine
+                asyncio.run_coroutine_threadsafe(
+                    self._dispatch_order_status(int(telegram_id), change.document.id,
+                                                order_data.get('status'), order_data.get('statusDetails')),
+                    self._main_loop
+                )
+        except Exception as e:
+            logger.error("Error in _on_order_status_change: %s", str(e))
+
+    async def _dispatch_order_status(self, telegram_id: int, order_doc_id: str, status: str, status_details: str) -> None:
+        """Resolve the session for a pushed order change and notify if it is current"""
+        session = self.user_sessions.get(telegram_id)
+        if not session or 'chat_id' not in session:
+            return
+        if session.get('order_id') != order_doc_id or session.payment_phase >= PaymentPhase.APPROVED:
+            return
+        await self._notify_order_status(session, status, status_details)
+
+    async def _notify_order_status(self, session: dict, status: str, status_details: str) -> None:
+        """Send the payment verified/rejected notification for an order change"""
+        try:
+            if session.payment_phase >= PaymentPhase.APPROVED:
+                return
+            if status == 'verified':
+                self.queue_message(
+                    chat_id=session.chat_id,
+                    text=self.get_prompt(session, 'payment_verified')
+                )
+                logger.info("Queued payment verified notification to chat_id %s for order %s", session.chat_id, session.order_id)
+            elif status == 'rejected':
+                reason = status_details or "No reason provided"
+                self.queue_message(
+                    chat_id=session.chat_id,
+                    text=self.get_prompt(session, 'payment_rejected').format(reason=reason)
+                )
+                logger.info("Queued payment rejected notification to chat_id %s for order %s", session.chat_id, session.order_id)
+            else:
+                return
+            session.payment_phase = (
+                PaymentPhase.APPROVED if status == 'verified' else PaymentPhase.REJECTED
+            )
+        except Exception as e:
+            logger.error("Error in _notify_order_status: %s", str(e))
+
+    def _cache_username(self, username: str, user_id: int) -> None:
+        """Insert a username mapping, evicting the least recently used entry
+        once the cache is full"""
+        self.user_cache[username] = user_id
+        self.user_cache.move_to_end(username)
+        if len(self.user_cache) > self._user_cache_max:
+            self.user_cache.popitem(last=False)
 
     async def cache_user_info(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Cache user information when they interact with the bot"""
         if update.effective_user and update.effective_user.username:
             username = update.effective_user.username.lower()
             user_id = update.effective_user.id
-            self.user_cache[username] = user_id
-            logger.debug(f"Cached user: @{username} -> {user_id}")
+            self._cache_username(username, user_id)
+            logger.debug("Cached user: @%s -> %s", username, user_id)
 
     async def resolve_username_to_id(self, username: str, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Try to resolve a username to a user ID using multiple methods"""
         clean_username = username.replace('@', '').lower()
         full_username = f"@{clean_username}"
         
-        logger.info(f"🔍 Attempting to resolve username: {full_username}")
+        logger.info("🔍 Attempting to resolve username: %s", full_username)
         
         if clean_username in self.user_cache:
-            logger.info(f"✅ Found {full_username} in cache: {self.user_cache[clean_username]}")
+            self.user_cache.move_to_end(clean_username)
+            logger.info("✅ Found %s in cache: %s", full_username, self.user_cache[clean_username])
             return self.user_cache[clean_username]
-        
+
+        failed_at = self._neg_cache.get(clean_username)
+        if failed_at is not None:
+            if time.monotonic() - failed_at < self._neg_cache_ttl:
+                logger.info("❌ %s is in the negative-resolve cache, failing fast", full_username)
+                raise ValueError(f"Could not resolve username {full_username} to user ID")
+            del self._neg_cache[clean_username]
+
+        # Fire all three resolve attempts concurrently and take the first
+        # hit, so the worst case costs max(RTT) instead of the sum
+        tasks = {
+            asyncio.create_task(self._resolve_via_get_chat(full_username, clean_username, context)),
+            asyncio.create_task(self._resolve_via_admins(full_username, clean_username, context)),
+            asyncio.create_task(self._resolve_via_member(full_username, clean_username, context)),
+        }
+        user_id = None
+        try:
+            while tasks and user_id is None:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result is not None:
+                        user_id = result
+                        break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if user_id is not None:
+            return user_id
+
+        logger.error("❌ Could not resolve username %s using any method", full_username)
+        now = time.monotonic()
+        if len(self._neg_cache) > 1000:
+            self._neg_cache = {
+                name: ts for name, ts in self._neg_cache.items()
+                if now - ts < self._neg_cache_ttl
+            }
+        self._neg_cache[clean_username] = now
+        raise ValueError(f"Could not resolve username {full_username} to user ID")
+
+    async def _resolve_via_get_chat(self, full_username: str, clean_username: str, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """Try resolving a username through get_chat"""
         try:
-            logger.info(f"🔄 Trying get_chat for {full_username}")
+            logger.info("🔄 Trying get_chat for %s", full_username)
             chat = await context.bot.get_chat(full_username)
             if chat.type == 'private':
                 user_id = chat.id
-                self.user_cache[clean_username] = user_id
-                logger.info(f"✅ Resolved {full_username} via get_chat: {user_id}")
+                self._cache_username(clean_username, user_id)
+                logger.info("✅ Resolved %s via get_chat: %s", full_username, user_id)
                 return user_id
-            else:
-                logger.warning(f"❌ {full_username} is not a private chat (type: {chat.type})")
+            logger.warning("❌ %s is not a private chat (type: %s)", full_username, chat.type)
         except telegram.error.BadRequest as e:
-            logger.warning(f"❌ Could not resolve {full_username} via get_chat: {str(e)}")
+            logger.warning("❌ Could not resolve %s via get_chat: %s", full_username, str(e))
         except Exception as e:
-            logger.error(f"❌ Unexpected error with get_chat for {full_username}: {str(e)}")
-        
+            logger.error("❌ Unexpected error with get_chat for %s: %s", full_username, str(e))
+        return None
+
+    async def _resolve_via_admins(self, full_username: str, clean_username: str, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """Try resolving a username from the private channel administrators"""
         try:
-            logger.info(f"🔄 Checking channel administrators for {full_username}")
+            logger.info("🔄 Checking channel administrators for %s", full_username)
             administrators = await context.bot.get_chat_administrators(private_channel_id)
             for admin in administrators:
                 if admin.user.username and admin.user.username.lower() == clean_username:
                     user_id = admin.user.id
-                    self.user_cache[clean_username] = user_id
-                    logger.info(f"✅ Found {full_username} as channel admin: {user_id}")
+                    self._cache_username(clean_username, user_id)
+                    logger.info("✅ Found %s as channel admin: %s", full_username, user_id)
                     return user_id
         except Exception as e:
-            logger.warning(f"❌ Could not check channel administrators: {str(e)}")
-        
+            logger.warning("❌ Could not check channel administrators: %s", str(e))
+        return None
+
+    async def _resolve_via_member(self, full_username: str, clean_username: str, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """Try resolving a username through the private channel membership"""
         try:
-            logger.info(f"🔄 Trying to get chat member info for {full_username}")
+            logger.info("🔄 Trying to get chat member info for %s", full_username)
             member = await context.bot.get_chat_member(private_channel_id, full_username)
             if member and member.user:
                 user_id = member.user.id
-                self.user_cache[clean_username] = user_id
-                logger.info(f"✅ Found {full_username} as channel member: {user_id}")
+                self._cache_username(clean_username, user_id)
+                logger.info("✅ Found %s as channel member: %s", full_username, user_id)
                 return user_id
         except Exception as e:
-            logger.warning(f"❌ Could not get chat member info: {str(e)}")
-        
-        logger.error(f"❌ Could not resolve username {full_username} using any method")
-        raise ValueError(f"Could not resolve username {full_username} to user ID")
+            logger.warning("❌ Could not get chat member info: %s", str(e))
+        return None
 
-    def get_user_session(self, user_id: str) -> dict:
+    def get_user_session(self, user_id: int) -> UserSession:
         """Get or create a user session"""
         if user_id not in self.user_sessions:
-            self.user_sessions[user_id] = {
-                'language': 'en',
-                'candidate_data': {'availability': 'To be specified'},
-                'careerObjectives': [],
-                'skills': [],
-                'education': [],
-                'languages': [],
-                'workExperiences': [],
-                'certificationsAwards': [],
-                'otherActivities': [],
-                'projects': [],
-                'current_field': None,
-                'current_work_experience': {},
-                'current_education': {},
-                'current_skill': {},
-                'current_certification': {},
-                'current_project': {},
-                'current_language': {}
-            }
+            self.user_sessions[user_id] = UserSession()
         return self.user_sessions[user_id]
 
+    async def _persist_session(self, telegram_id: int, session: UserSession) -> None:
+        """Write a session to Redis with a TTL; no-op without a store"""
+        if self._redis is None:
+            return
+        try:
+            payload = msgpack.packb(session.to_payload(), default=str)
+            await self._redis.setex(f"sess:{telegram_id}", SESSION_TTL_SECONDS, payload)
+        except Exception as e:
+            logger.warning("Failed to persist session for %s: %s", telegram_id, str(e))
+
+    async def _restore_session(self, telegram_id: int) -> None:
+        """Load a session from Redis into memory if one is stored"""
+        if self._redis is None:
+            return
+        try:
+            payload = await self._redis.get(f"sess:{telegram_id}")
+            if payload is not None:
+                self.user_sessions[telegram_id] = UserSession.from_payload(
+                    msgpack.unpackb(payload, raw=False)
+                )
+                logger.info("Restored session for %s from Redis", telegram_id)
+        except Exception as e:
+            logger.warning("Failed to restore session for %s: %s", telegram_id, str(e))
+
+    async def _flush_loop(self) -> None:
+        """Write-behind persistence: batch all sessions touched in the last
+        500 ms into one pipelined Redis round-trip, keeping persistence off
+        the handler critical path"""
+        while True:
+            await asyncio.sleep(0.5)
+            if not self._dirty:
+                continue
+            to_flush, self._dirty = self._dirty, set()
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for telegram_id in to_flush:
+                    session = self.user_sessions.get(telegram_id)
+                    if session is None:
+                        continue
+                    pipe.setex(
+                        f"sess:{telegram_id}",
+                        SESSION_TTL_SECONDS,
+                        msgpack.packb(session.to_payload(), default=str)
+                    )
+                await pipe.execute()
+            except Exception as e:
+                logger.warning("Write-behind flush of %s sessions failed: %s", len(to_flush), str(e))
+                self._dirty |= to_flush
+
+    async def _get_session_restoring(self, telegram_id: int) -> UserSession:
+        """Get a session, falling back to the external store after restarts"""
+        if telegram_id not in self.user_sessions:
+            await self._restore_session(telegram_id)
+        return self.get_user_session(telegram_id)
+
+    def _bind_session(self, update: Update):
+        """Resolve (telegram_id, session) for an update in one place.
+
+        Replaces the id-lookup/chat-id preamble every handler repeated, so
+        each update pays for it exactly once. Sessions are keyed by the
+        numeric Telegram id; handlers only stringify at the Firestore
+        boundary, where telegramUserId is stored as a string.
+        """
+        telegram_id = update.effective_user.id
+        session = self.get_user_session(telegram_id)
+        if update.effective_chat is not None:
+            session.chat_id = update.effective_chat.id
+        if self._redis is not None:
+            self._dirty.add(telegram_id)
+        return telegram_id, session
+
+    async def _db_call(self, fn, *args):
+        """Run a blocking Firestore model call on the shared executor
+
+        The models are shared with the Django admin site, so they stay on
+        the synchronous client; this keeps their lookups off the event loop
+        without a second client implementation.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.db_executor, fn, *args)
+
     def get_prompt(self, session: dict, key: str) -> str:
-        """Get the appropriate prompt based on the user's language"""
-        return PROMPTS[session['language']][key]
+        """Get the appropriate prompt based on the user's language.
+
+        The session keeps a direct reference to its language's prompt
+        table, so this is one string-keyed dict hit — cheaper than a flat
+        (lang, key)-tuple table, which would hash two strings per call.
+        """
+        return session.prompts[key]
 
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Send welcome message and prompt for language selection"""
-        user = update.effective_user
-        telegram_id = str(user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
+        telegram_id, session = self._bind_session(update)
         
         await update.message.reply_text(
             self.get_prompt(session, 'select_language'),
@@ -388,89 +1041,83 @@ class CVBot:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = str(query.from_user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = query.message.chat_id
+        telegram_id, session = self._bind_session(update)
         
-        session['language'] = query.data.split('_')[1]
+        session.language = query.data.split('_')[1]
+        session.prompts = PROMPTS[session.language]
         
-        candidate = Candidate.get_by_telegram_user_id(telegram_id)
+        candidate = await self._db_call(Candidate.get_by_telegram_user_id, str(telegram_id))
         menu_text = self.get_prompt(session, 'welcome_back' if candidate else 'welcome')
-        reply_markup = InlineKeyboardMarkup([
-            [InlineKeyboardButton(self.get_prompt(session, 'create_new_cv'), callback_data="new_cv")],
-            [InlineKeyboardButton(self.get_prompt(session, 'guide_video'), callback_data="guide_video")],
-            [InlineKeyboardButton(self.get_prompt(session, 'samples'), callback_data="samples")]
-        ])
+        reply_markup = self._main_menu_markup[session.language]
         
         # Edit the query message and store the message ID
         message = await query.edit_message_text(
             menu_text,
             reply_markup=reply_markup
         )
-        session['menu_message_id'] = message.message_id
-        logger.info(f"Stored menu message ID {message.message_id} for user {telegram_id}")
+        session.menu_message_id = message.message_id
+        logger.info("Stored menu message ID %s for user %s", message.message_id, telegram_id)
         
         return START
-    
+
+    async def _dispatch_start_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """Route START-state button presses through a single dict lookup"""
+        handler = self._start_cb_dispatch.get(update.callback_query.data)
+        if handler is None:
+            await update.callback_query.answer()
+            return START
+        return await handler(update, context)
+
     async def handle_returning_user_choice(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Handle choices for users"""
         query = update.callback_query
         await query.answer()
+        data = sys.intern(query.data)
         
-        telegram_id = str(query.from_user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = query.message.chat_id
+        telegram_id, session = self._bind_session(update)
         
-        if query.data == "new_cv":
+        if data == "new_cv":
             # Delete the previous menu message if it exists
             if 'menu_message_id' in session:
                 try:
                     await context.bot.delete_message(
-                        chat_id=session['chat_id'],
-                        message_id=session['menu_message_id']
+                        chat_id=session.chat_id,
+                        message_id=session.menu_message_id
                     )
-                    logger.info(f"Deleted menu message ID {session['menu_message_id']} for user {telegram_id}")
-                    del session['menu_message_id']
+                    logger.info("Deleted menu message ID %s for user %s", session.menu_message_id, telegram_id)
+                    session.menu_message_id = None
                 except Exception as e:
-                    logger.warning(f"Failed to delete menu message ID {session['menu_message_id']} for user {telegram_id}: {str(e)}")
+                    logger.warning("Failed to delete menu message ID %s for user %s: %s", session.menu_message_id, telegram_id, str(e))
             await query.edit_message_text(
                 self.get_prompt(session, 'welcome_new'), parse_mode="HTML"
             )
-            session['current_field'] = 'firstName'
+            session.current_field = 'firstName'
             return COLLECT_PERSONAL_INFO
-        elif query.data == "guide_video":
-            await self.send_tutorial_video(session['chat_id'], session, context)
+        elif data == "guide_video":
+            await self.send_tutorial_video(session.chat_id, session, context)
             # Show the menu again after sending the video
             menu_text = self.get_prompt(session, 'choose_option')
-            reply_markup = InlineKeyboardMarkup([
-                [InlineKeyboardButton(self.get_prompt(session, 'create_new_cv'), callback_data="new_cv")],
-                [InlineKeyboardButton(self.get_prompt(session, 'guide_video'), callback_data="guide_video")],
-                [InlineKeyboardButton(self.get_prompt(session, 'samples'), callback_data="samples")]
-            ])
+            reply_markup = self._main_menu_markup[session.language]
             message = await context.bot.send_message(
-                chat_id=session['chat_id'],
+                chat_id=session.chat_id,
                 text=menu_text,
                 reply_markup=reply_markup
             )
-            session['menu_message_id'] = message.message_id
-            logger.info(f"Stored menu message ID {message.message_id} for user {telegram_id} after guide video")
+            session.menu_message_id = message.message_id
+            logger.info("Stored menu message ID %s for user %s after guide video", message.message_id, telegram_id)
             return START
-        elif query.data == "samples":
-            await self.send_sample_cvs(session['chat_id'], session, context)
+        elif data == "samples":
+            await self.send_sample_cvs(session.chat_id, session, context)
             # Show the menu again after sending samples
             menu_text = self.get_prompt(session, 'choose_option')
-            reply_markup = InlineKeyboardMarkup([
-                [InlineKeyboardButton(self.get_prompt(session, 'create_new_cv'), callback_data="new_cv")],
-                [InlineKeyboardButton(self.get_prompt(session, 'guide_video'), callback_data="guide_video")],
-                [InlineKeyboardButton(self.get_prompt(session, 'samples'), callback_data="samples")]
-            ])
+            reply_markup = self._main_menu_markup[session.language]
             message = await context.bot.send_message(
-                chat_id=session['chat_id'],
+                chat_id=session.chat_id,
                 text=menu_text,
                 reply_markup=reply_markup
             )
-            session['menu_message_id'] = message.message_id
-            logger.info(f"Stored menu message ID {message.message_id} for user {telegram_id} after samples")
+            session.menu_message_id = message.message_id
+            logger.info("Stored menu message ID %s for user %s after samples", message.message_id, telegram_id)
             return START
     
     async def send_tutorial_video(self, chat_id: int, session: dict, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -479,13 +1126,13 @@ class CVBot:
         if 'menu_message_id' in session:
             try:
                 await context.bot.delete_message(
-                    chat_id=session['chat_id'],
-                    message_id=session['menu_message_id']
+                    chat_id=session.chat_id,
+                    message_id=session.menu_message_id
                 )
-                logger.info(f"Deleted menu message ID {session['menu_message_id']} for user {session['chat_id']}")
-                del session['menu_message_id']
+                logger.info("Deleted menu message ID %s for user %s", session.menu_message_id, session.chat_id)
+                session.menu_message_id = None
             except Exception as e:
-                logger.warning(f"Failed to delete menu message ID {session['menu_message_id']} for user {session['chat_id']}: {str(e)}")
+                logger.warning("Failed to delete menu message ID %s for user %s: %s", session.menu_message_id, session.chat_id, str(e))
         
         if tutorial_video_file_id:
             try:
@@ -495,9 +1142,9 @@ class CVBot:
                     caption=tutorial_video_caption or self.get_prompt(session, 'tutorial_message'),
                     parse_mode='HTML' if tutorial_video_caption else None
                 )
-                logger.info(f"Sent tutorial video with file_id {tutorial_video_file_id} to chat_id {chat_id}")
+                logger.info("Sent tutorial video with file_id %s to chat_id %s", tutorial_video_file_id, chat_id)
             except Exception as e:
-                logger.error(f"Error sending tutorial video: {str(e)}")
+                logger.error("Error sending tutorial video: %s", str(e))
                 await context.bot.send_message(
                     chat_id=chat_id,
                     text=self.get_prompt(session, 'error_message')
@@ -516,47 +1163,36 @@ class CVBot:
         if 'menu_message_id' in session:
             try:
                 await context.bot.delete_message(
-                    chat_id=session['chat_id'],
-                    message_id=session['menu_message_id']
+                    chat_id=session.chat_id,
+                    message_id=session.menu_message_id
                 )
-                logger.info(f"Deleted menu message ID {session['menu_message_id']} for user {session['chat_id']}")
-                del session['menu_message_id']
+                logger.info("Deleted menu message ID %s for user %s", session.menu_message_id, session.chat_id)
+                session.menu_message_id = None
             except Exception as e:
-                logger.warning(f"Failed to delete menu message ID {session['menu_message_id']} for user {session['chat_id']}: {str(e)}")
+                logger.warning("Failed to delete menu message ID %s for user %s: %s", session.menu_message_id, session.chat_id, str(e))
         
-        if sample_cv_file_ids and sample_cv_file_ids[0]:
+        if sample_cv_media_groups:
             try:
                 await context.bot.send_message(
                     chat_id=chat_id,
                     text=self.get_prompt(session, 'sending_samples')
                 )
-                for file_id, caption in zip(sample_cv_file_ids, sample_cv_captions):
-                    if file_id.strip():  # Skip empty file IDs
-                        try:
-                            # Assume file_id could be for document or photo
-                            # Try sending as document first
-                            try:
-                                await context.bot.send_document(
-                                    chat_id=chat_id,
-                                    document=file_id,
-                                    caption=caption or None,
-                                    parse_mode='HTML' if caption else None
-                                )
-                                logger.info(f"Sent sample CV document with file_id {file_id} to chat_id {chat_id}")
-                            except telegram.error.BadRequest:
-                                # If document fails, try as photo
-                                await context.bot.send_photo(
-                                    chat_id=chat_id,
-                                    photo=file_id,
-                                    caption=caption or None,
-                                    parse_mode='HTML' if caption else None
-                                )
-                                logger.info(f"Sent sample CV photo with file_id {file_id} to chat_id {chat_id}")
-                        except Exception as e:
-                            logger.error(f"Error sending sample CV with file_id {file_id}: {str(e)}")
-                logger.info(f"Sent {len(sample_cv_file_ids)} sample CVs to chat_id {chat_id}")
+                for media in sample_cv_media_groups:
+                    if len(media) > 1:
+                        await context.bot.send_media_group(chat_id=chat_id, media=media)
+                    elif isinstance(media[0], InputMediaPhoto):
+                        await context.bot.send_photo(
+                            chat_id=chat_id, photo=media[0].media,
+                            caption=media[0].caption, parse_mode=media[0].parse_mode
+                        )
+                    else:
+                        await context.bot.send_document(
+                            chat_id=chat_id, document=media[0].media,
+                            caption=media[0].caption, parse_mode=media[0].parse_mode
+                        )
+                logger.info("Sent %s sample CVs to chat_id %s", sum(len(g) for g in sample_cv_media_groups), chat_id)
             except Exception as e:
-                logger.error(f"Error sending sample CVs: {str(e)}")
+                logger.error("Error sending sample CVs: %s", str(e))
                 await context.bot.send_message(
                     chat_id=chat_id,
                     text=self.get_prompt(session, 'error_message')
@@ -572,52 +1208,34 @@ class CVBot:
         """Handle user choice to update profile or create new CV"""
         query = update.callback_query
         await query.answer()
+        data = sys.intern(query.data)
         
-        telegram_id = str(query.from_user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = query.message.chat_id
+        telegram_id, session = self._bind_session(update)
         
-        if query.data == "update_profile":
-            candidate = Candidate.get_by_telegram_user_id(telegram_id)
+        if data == "update_profile":
+            candidate = await self._db_call(Candidate.get_by_telegram_user_id, str(telegram_id))
             if not candidate:
-                logger.error(f"No candidate found for telegram_id {telegram_id}")
-                await query.edit_message_text(self.get_prompt(session, 'error_message'))
+                logger.error("No candidate found for telegram_id %s", telegram_id)
+                self.queue_edit(query, self.get_prompt(session, 'error_message'))
                 return START
             
-            session['candidate_data'] = candidate.to_dict()
-            session['candidate_data']['availability'] = session['candidate_data'].get('availability', 'To be specified')
+            session.candidate_data = candidate.to_dict()
+            session.candidate_data['availability'] = session.candidate_data.get('availability', 'To be specified')
             
-            manager = CandidateManager(candidate.uid)
-            profile = manager.get_complete_profile()
-            logger.info(f"Retrieved profile for candidate {candidate.uid}: {len(profile.get('projects', []))} projects, {len(profile.get('workExperiences', []))} work experiences")
+            # CandidateManager's constructor fetches the candidate doc, so it
+            # belongs on the executor too
+            manager = await self._db_call(CandidateManager, candidate.uid)
+            profile = await manager.get_complete_profile_async(executor=self.db_executor)
+            logger.info("Retrieved profile for candidate %s: %s projects, %s work experiences", candidate.uid, len(profile.get('projects', [])), len(profile.get('workExperiences', [])))
             
-            # Validate and filter subcollections to ensure they belong to the candidate
-            subcollections = {
-                'workExperiences': profile.get('workExperiences', []),
-                'education': profile.get('education', []),
-                'skills': profile.get('skills', []),
-                'careerObjectives': profile.get('careerObjectives', []),
-                'certificationsAwards': profile.get('certificationsAwards', []),
-                'projects': profile.get('projects', []),
-                'languages': profile.get('languages', []),
-                'otherActivities': profile.get('otherActivities', [])
-            }
-            
-            for collection_name, items in subcollections.items():
-                filtered_items = []
-                for item in items:
-                    doc_candidate_uid = item.get('candidate_uid')
-                    if not doc_candidate_uid:
-                        logger.warning(f"Discarded {collection_name} item with missing candidate_uid: {item.get('id', 'unknown')}")
-                        continue
-                    if doc_candidate_uid != candidate.uid:
-                        logger.warning(f"Discarded {collection_name} item {item.get('id', 'unknown')} with mismatched candidate_uid {doc_candidate_uid}, expected {candidate.uid}")
-                        continue
-                    filtered_items.append(item)
-                session[collection_name] = filtered_items
-                if len(filtered_items) != len(items):
-                    logger.warning(f"Filtered out {len(items) - len(filtered_items)} invalid {collection_name} entries for candidate {candidate.uid}")
-                logger.info(f"Loaded {len(filtered_items)} {collection_name} for candidate {candidate.uid}")
+            # The subcollection queries filter on candidate_uid server-side,
+            # so what comes back is already scoped to this candidate
+            for collection_name in ('workExperiences', 'education', 'skills',
+                                    'careerObjectives', 'certificationsAwards',
+                                    'projects', 'languages', 'otherActivities'):
+                items = profile.get(collection_name, [])
+                session[collection_name] = list(items)
+                logger.info("Loaded %s %s for candidate %s", len(items), collection_name, candidate.uid)
             
             await query.edit_message_text(
                 self.get_prompt(session, 'edit_section'),
@@ -628,11 +1246,61 @@ class CVBot:
             await query.edit_message_text(
                 self.get_prompt(session, 'welcome_new')  , parse_mode="HTML"
             )
-            session['current_field'] = 'firstName'
+            session.current_field = 'firstName'
             return COLLECT_PERSONAL_INFO
 
     def get_profile_sections_keyboard(self, session: dict) -> InlineKeyboardMarkup:
-        """Create keyboard for profile sections in the selected language"""
+        """Get the profile-sections keyboard for the selected language.
+
+        The keyboard is immutable per language, so it is built once and
+        reused instead of constructing eleven buttons per edit event.
+        """
+        markup = self._sections_kb_cache.get(session.language)
+        if markup is None:
+            markup = self._build_profile_sections_keyboard(session)
+            self._sections_kb_cache[session.language] = markup
+        return markup
+
+    def _choice_kb(self, session: dict, add_callback: str, continue_callback: str) -> InlineKeyboardMarkup:
+        """Get the cached add-another/continue keyboard for a section.
+
+        These two-button markups are immutable per (language, section), so
+        they are built on first use instead of on every collected message.
+        """
+        key = (session.language, add_callback)
+        markup = self._choice_kb_cache.get(key)
+        if markup is None:
+            markup = InlineKeyboardMarkup([
+                [InlineKeyboardButton(self.get_prompt(session, 'add_another'), callback_data=add_callback)],
+                [InlineKeyboardButton(self.get_prompt(session, 'continue'), callback_data=continue_callback)]
+            ])
+            self._choice_kb_cache[key] = markup
+        return markup
+
+    def _continue_professional_kb(self, session: dict) -> InlineKeyboardMarkup:
+        """Cached one-button continue markup for the profile-image step"""
+        markup = self._continue_prof_kb_cache.get(session.language)
+        if markup is None:
+            markup = InlineKeyboardMarkup([
+                [InlineKeyboardButton(self.get_prompt(session, 'continue_professional'), callback_data="continue_professional")]
+            ])
+            self._continue_prof_kb_cache[session.language] = markup
+        return markup
+
+    def _confirm_kb(self, session: dict) -> InlineKeyboardMarkup:
+        """Cached confirm/edit markup shown under the order summary"""
+        markup = self._confirm_kb_cache.get(session.language)
+        if markup is None:
+            markup = InlineKeyboardMarkup([
+                [
+                    InlineKeyboardButton(self.get_prompt(session, 'confirm'), callback_data="confirm_yes"),
+                    InlineKeyboardButton(self.get_prompt(session, 'edit'), callback_data="edit_no")
+                ]
+            ])
+            self._confirm_kb_cache[session.language] = markup
+        return markup
+
+    def _build_profile_sections_keyboard(self, session: dict) -> InlineKeyboardMarkup:
         return InlineKeyboardMarkup([
             [InlineKeyboardButton(self.get_prompt(session, 'personal_info'), callback_data="edit_personal")],
             [InlineKeyboardButton(self.get_prompt(session, 'contact_info'), callback_data="edit_contact")],
@@ -647,80 +1315,35 @@ class CVBot:
             [InlineKeyboardButton(self.get_prompt(session, 'other_activities'), callback_data="edit_activities")]
         ])
 
-    async def collect_personal_info(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-        """Collect personal information from candidate"""
-        user = update.effective_user
-        telegram_id = str(user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
-        current_field = session['current_field']
-        
-        if current_field == 'firstName':
-            session['candidate_data']['firstName'] = update.message.text
-            session['current_field'] = 'middleName'
-            await update.message.reply_text(self.get_prompt(session, 'middle_name'))
-            return COLLECT_PERSONAL_INFO
-        elif current_field == 'middleName':
-            session['candidate_data']['middleName'] = update.message.text
-            session['current_field'] = 'lastName'
-            await update.message.reply_text(self.get_prompt(session, 'last_name'))
-            return COLLECT_PERSONAL_INFO
-        elif current_field == 'lastName':
-            session['candidate_data']['lastName'] = update.message.text
-            session['current_field'] = 'phoneNumber'
-            await update.message.reply_text(self.get_prompt(session, 'phone_number'))
-            return COLLECT_CONTACT_INFO
-
-    async def collect_contact_info(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-        """Collect contact information from candidate"""
-        user = update.effective_user
-        telegram_id = str(user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
-        current_field = session['current_field']
-        
-        if current_field == 'phoneNumber':
-            session['candidate_data']['phoneNumber'] = update.message.text
-            session['current_field'] = 'emailAddress'
-            await update.message.reply_text(self.get_prompt(session, 'email_address'))
-            return COLLECT_CONTACT_INFO
-        elif current_field == 'emailAddress':
-            session['candidate_data']['emailAddress'] = update.message.text
-            session['current_field'] = 'linkedinProfile'
-            await update.message.reply_text(self.get_prompt(session, 'linkedin_profile'))
-            return COLLECT_CONTACT_INFO
-        elif current_field == 'linkedinProfile':
-            session['candidate_data']['linkedinProfile'] = update.message.text if update.message.text.lower() != 'skip' else None
-            session['current_field'] = 'city'
-            await update.message.reply_text(self.get_prompt(session, 'city'))
-            return COLLECT_CONTACT_INFO
-        elif current_field == 'city':
-            session['candidate_data']['city'] = update.message.text
-            session['current_field'] = 'country'
-            await update.message.reply_text(self.get_prompt(session, 'country'))
-            return COLLECT_CONTACT_INFO
-        elif current_field == 'country':
-            session['candidate_data']['country'] = update.message.text
-            session['current_field'] = None
-            await update.message.reply_text(self.get_prompt(session, 'profile_image_prompt'))
-            return COLLECT_PROFILE_IMAGE
+    async def collect_candidate_field(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """Collect one personal/contact field, driven by FIELD_FSM"""
+        telegram_id, session = self._bind_session(update)
+
+        step = FIELD_DISPATCH.get(session.current_field)
+        if step is None:
+            return None
+        prompt_key, next_state = step(session, update.message.text)
+        await update.message.reply_text(self.get_prompt(session, prompt_key))
+        return next_state
+
+    @staticmethod
+    def _format_user_caption(user, telegram_id: int) -> str:
+        """Build the user line for media forwarded to the private channel"""
+        name_line = f"👤 User: {user.first_name or ''} {user.last_name or ''}".strip()
+        if user.username:
+            name_line = f"{name_line} (@{user.username})"
+        return f"{name_line}\n🆔 User ID: {telegram_id}"
 
     async def collect_profile_image(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Collect profile image from candidate"""
-        telegram_id = str(update.effective_user.id)
+        telegram_id = update.effective_user.id
         session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
+        session.chat_id = update.effective_chat.id
         
-        max_size = 5 * 1024 * 1024
-        allowed_mime_types = ['image/jpeg', 'image/png', 'application/pdf']
-        allowed_extensions = ['jpg', 'jpeg', 'png', 'pdf']
-        
-        if update.message.text and update.message.text.lower() == 'skip':
+        if _is_skip(update.message.text):
             await update.message.reply_text(
                 self.get_prompt(session, 'profile_image_skip'),
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton(self.get_prompt(session, 'continue_professional'), callback_data="continue_professional")]
-                ])
+                reply_markup=self._continue_professional_kb(session)
             )
             return COLLECT_PROFILE_IMAGE
         
@@ -728,62 +1351,57 @@ class CVBot:
             if update.message.photo:
                 photo = update.message.photo[-1]
                 file = await photo.get_file()
-                if file.file_size > max_size:
+                if file.file_size > self._MAX_FILE_SIZE:
                     await update.message.reply_text(self.get_prompt(session, 'file_too_large'))
                     return COLLECT_PROFILE_IMAGE
                 file_url = file.file_path
-                user = update.effective_user
-                user_info = f"👤 User: {user.first_name or ''} {user.last_name or ''}".strip()
-                if user.username:
-                    user_info += f" (@{user.username})"
-                user_info += f"\n🆔 User ID: {telegram_id}"
-                await context.bot.send_photo(
+                user_info = self._format_user_caption(update.effective_user, telegram_id)
+                forward = context.bot.send_photo(
                     chat_id=private_channel_id,
                     photo=photo.file_id,
                     caption=f"📸 Profile Image Received\n\n{user_info}"
                 )
-                session['candidate_data']['profileImageUrl'] = file_url
-                logger.info(f"Profile image uploaded for user {telegram_id}")
+                session.candidate_data['profileImageUrl'] = file_url
+                logger.info("Profile image uploaded for user %s", telegram_id)
             elif update.message.document:
                 document = update.message.document
-                if document.file_size > max_size:
+                if document.file_size > self._MAX_FILE_SIZE:
                     await update.message.reply_text(self.get_prompt(session, 'file_too_large'))
                     return COLLECT_PROFILE_IMAGE
-                if document.mime_type not in allowed_mime_types:
+                if document.mime_type not in self._ALLOWED_MIME:
                     await update.message.reply_text(self.get_prompt(session, 'invalid_file_type'))
                     return COLLECT_PROFILE_IMAGE
                 if document.file_name:
-                    extension = document.file_name.split('.')[-1].lower()
-                    if extension not in allowed_extensions:
+                    extension = document.file_name.rpartition('.')[2].lower()
+                    if extension not in self._ALLOWED_EXT:
                         await update.message.reply_text(self.get_prompt(session, 'invalid_file_type'))
                         return COLLECT_PROFILE_IMAGE
                 file = await document.get_file()
                 file_url = file.file_path
-                user = update.effective_user
-                user_info = f"👤 User: {user.first_name or ''} {user.last_name or ''}".strip()
-                if user.username:
-                    user_info += f" (@{user.username})"
-                user_info += f"\n🆔 User ID: {telegram_id}"
-                await context.bot.send_document(
+                user_info = self._format_user_caption(update.effective_user, telegram_id)
+                forward = context.bot.send_document(
                     chat_id=private_channel_id,
                     document=document.file_id,
                     caption=f"📸 Profile Image Received\n\n{user_info}"
                 )
-                session['candidate_data']['profileImageUrl'] = file_url
-                logger.info(f"Profile image (document) uploaded for user {telegram_id}")
+                session.candidate_data['profileImageUrl'] = file_url
+                logger.info("Profile image (document) uploaded for user %s", telegram_id)
             else:
                 await update.message.reply_text(self.get_prompt(session, 'invalid_file_type'))
                 return COLLECT_PROFILE_IMAGE
             
-            await update.message.reply_text(
-                self.get_prompt(session, 'profile_image_success'),
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton(self.get_prompt(session, 'continue_professional'), callback_data="continue_professional")]
-                ])
+            # The channel forward and the user-facing reply are independent
+            # API calls, so overlap them instead of paying two round-trips
+            await asyncio.gather(
+                forward,
+                update.message.reply_text(
+                    self.get_prompt(session, 'profile_image_success'),
+                    reply_markup=self._continue_professional_kb(session)
+                )
             )
             return COLLECT_PROFILE_IMAGE
         except Exception as e:
-            logger.error(f"Error handling profile image upload: {str(e)}")
+            logger.error("Error handling profile image upload: %s", str(e))
             await update.message.reply_text(self.get_prompt(session, 'error_message'))
             return COLLECT_PROFILE_IMAGE
 
@@ -791,58 +1409,51 @@ class CVBot:
         """Handle profile image choice (skip or continue)"""
         query = update.callback_query
         await query.answer()
+        data = sys.intern(query.data)
         
-        telegram_id = str(query.from_user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = query.message.chat_id
+        telegram_id, session = self._bind_session(update)
         
-        if query.data == "continue_professional":
-            session['current_field'] = 'work_jobTitle'
-            session['current_work_experience'] = {}
-            await query.edit_message_text(self.get_prompt(session, 'job_title_with_skip'))
+        if data == "continue_professional":
+            session.current_field = 'work_jobTitle'
+            session.current_work_experience = {}
+            self.queue_edit(query, self.get_prompt(session, 'job_title_with_skip'))
             return COLLECT_PROFESSIONAL_INFO
 
     async def collect_professional_info(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Collect professional information from candidate"""
-        user = update.effective_user
-        telegram_id = str(user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
-        current_field = session['current_field']
+        telegram_id, session = self._bind_session(update)
+        current_field = session.current_field
         
         if current_field == 'work_jobTitle':
-            if update.message.text.lower() == 'skip':
-                session['workExperiences'] = []  # Set empty work experiences
-                session['current_field'] = 'edu_degreeName'
-                session['current_education'] = {}
+            if _is_skip(update.message.text):
+                session.workExperiences = []  # Set empty work experiences
+                session.current_field = 'edu_degreeName'
+                session.current_education = {}
                 await update.message.reply_text(self.get_prompt(session, 'degree_name'))
                 return COLLECT_EDUCATION
             
             # Normal flow continues
-            session['current_work_experience']['jobTitle'] = update.message.text
-            session['current_field'] = 'work_companyName'
+            session.current_work_experience['jobTitle'] = update.message.text
+            session.current_field = 'work_companyName'
             await update.message.reply_text(self.get_prompt(session, 'company_name'))
             return COLLECT_PROFESSIONAL_INFO
         elif current_field == 'work_companyName':
-            session['current_work_experience']['companyName'] = update.message.text
-            session['current_field'] = 'work_location'
+            session.current_work_experience['companyName'] = update.message.text
+            session.current_field = 'work_location'
             await update.message.reply_text(self.get_prompt(session, 'work_location'))
             return COLLECT_PROFESSIONAL_INFO
         elif current_field == 'work_location':
-            session['current_work_experience']['location'] = update.message.text
-            session['current_field'] = 'work_description'
+            session.current_work_experience['location'] = update.message.text
+            session.current_field = 'work_description'
             await update.message.reply_text(self.get_prompt(session, 'work_description'))
             return COLLECT_PROFESSIONAL_INFO
         elif current_field == 'work_description':
-            session['current_work_experience']['description'] = update.message.text
-            session['workExperiences'].append(session['current_work_experience'].copy())
-            session['current_work_experience'] = {}
+            session.current_work_experience['description'] = update.message.text
+            session.workExperiences.append(session.current_work_experience)
+            session.current_work_experience = {}
             await update.message.reply_text(
                 self.get_prompt(session, 'add_another_work'),
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton(self.get_prompt(session, 'add_another'), callback_data="add_another_work")],
-                    [InlineKeyboardButton(self.get_prompt(session, 'continue'), callback_data="continue_education")]
-                ])
+                reply_markup=self._choice_kb(session, "add_another_work", "continue_education")
             )
             return COLLECT_PROFESSIONAL_INFO
 
@@ -850,59 +1461,52 @@ class CVBot:
         """Handle the user's choice to add another work experience or continue"""
         query = update.callback_query
         await query.answer()
+        data = sys.intern(query.data)
         
-        telegram_id = str(query.from_user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = query.message.chat_id
+        telegram_id, session = self._bind_session(update)
         
-        if query.data == "add_another_work":
-            session['current_field'] = 'work_jobTitle'
-            await query.edit_message_text(self.get_prompt(session, 'job_title'))
+        if data == "add_another_work":
+            session.current_field = 'work_jobTitle'
+            self.queue_edit(query, self.get_prompt(session, 'job_title'))
             return COLLECT_PROFESSIONAL_INFO
-        elif query.data == "continue_education":
-            session['current_field'] = 'edu_degreeName'
-            session['current_education'] = {}
-            await query.edit_message_text(self.get_prompt(session, 'degree_name'))
+        elif data == "continue_education":
+            session.current_field = 'edu_degreeName'
+            session.current_education = {}
+            self.queue_edit(query, self.get_prompt(session, 'degree_name'))
             return COLLECT_EDUCATION
 
     async def collect_education(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Collect education information from candidate"""
-        user = update.effective_user
-        telegram_id = str(user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
-        current_field = session['current_field']
+        telegram_id, session = self._bind_session(update)
+        current_field = session.current_field
         
         if current_field == 'edu_degreeName':
-            session['current_education']['degreeName'] = update.message.text
-            session['current_field'] = 'edu_institutionName'
+            session.current_education['degreeName'] = update.message.text
+            session.current_field = 'edu_institutionName'
             await update.message.reply_text(self.get_prompt(session, 'institution_name'))
             return COLLECT_EDUCATION
         elif current_field == 'edu_institutionName':
-            session['current_education']['institutionName'] = update.message.text
-            session['current_field'] = 'edu_gpa'
+            session.current_education['institutionName'] = update.message.text
+            session.current_field = 'edu_gpa'
             await update.message.reply_text(self.get_prompt(session, 'gpa'))
             return COLLECT_EDUCATION
         elif current_field == 'edu_gpa':
-            session['current_education']['gpa'] = update.message.text if update.message.text.lower() != 'skip' else None
-            session['current_field'] = 'edu_description'
+            session.current_education['gpa'] = None if _is_skip(update.message.text) else update.message.text
+            session.current_field = 'edu_description'
             await update.message.reply_text(self.get_prompt(session, 'edu_description'))
             return COLLECT_EDUCATION
         elif current_field == 'edu_description':
-            session['current_education']['description'] = update.message.text
-            session['current_field'] = 'edu_achievementsHonors'
+            session.current_education['description'] = update.message.text
+            session.current_field = 'edu_achievementsHonors'
             await update.message.reply_text(self.get_prompt(session, 'achievements_honors'))
             return COLLECT_EDUCATION
         elif current_field == 'edu_achievementsHonors':
-            session['current_education']['achievementsHonors'] = update.message.text if update.message.text.lower() != 'skip' else None
-            session['education'].append(session['current_education'].copy())
-            session['current_education'] = {}
+            session.current_education['achievementsHonors'] = None if _is_skip(update.message.text) else update.message.text
+            session.education.append(session.current_education)
+            session.current_education = {}
             await update.message.reply_text(
                 self.get_prompt(session, 'add_another_edu'),
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton(self.get_prompt(session, 'add_another'), callback_data="add_another_edu")],
-                    [InlineKeyboardButton(self.get_prompt(session, 'continue'), callback_data="continue_skills")]
-                ])
+                reply_markup=self._choice_kb(session, "add_another_edu", "continue_skills")
             )
             return COLLECT_EDUCATION
 
@@ -910,43 +1514,36 @@ class CVBot:
         """Handle the user's choice to add another education entry or continue"""
         query = update.callback_query
         await query.answer()
+        data = sys.intern(query.data)
         
-        telegram_id = str(query.from_user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = query.message.chat_id
+        telegram_id, session = self._bind_session(update)
         
-        if query.data == 'add_another_edu':
-            session['current_field'] = 'edu_degreeName'
-            await query.edit_message_text(self.get_prompt(session, 'degree_name'))
+        if data == 'add_another_edu':
+            session.current_field = 'edu_degreeName'
+            self.queue_edit(query, self.get_prompt(session, 'degree_name'))
             return COLLECT_EDUCATION
-        elif query.data == 'continue_skills':
-            session['skills'] = []  # Set empty skills list
-            await query.edit_message_text(self.get_prompt(session, 'career_summary'))
+        elif data == 'continue_skills':
+            session.skills = []  # Set empty skills list
+            self.queue_edit(query, self.get_prompt(session, 'career_summary'))
             return COLLECT_CAREER_OBJECTIVE
 
     async def collect_skills(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Collect skills from candidate"""
-        user = update.effective_user
-        telegram_id = str(user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
-        current_field = session['current_field']
+        telegram_id, session = self._bind_session(update)
+        current_field = session.current_field
         
         if current_field == 'skill_skillName':
-            session['current_skill']['skillName'] = update.message.text
-            session['current_field'] = 'skill_proficiency'
+            session.current_skill['skillName'] = update.message.text
+            session.current_field = 'skill_proficiency'
             await update.message.reply_text(self.get_prompt(session, 'skill_proficiency'))
             return COLLECT_SKILLS
         elif current_field == 'skill_proficiency':
-            session['current_skill']['proficiency'] = update.message.text
-            session['skills'].append(session['current_skill'].copy())
-            session['current_skill'] = {}
+            session.current_skill['proficiency'] = update.message.text
+            session.skills.append(session.current_skill)
+            session.current_skill = {}
             await update.message.reply_text(
                 self.get_prompt(session, 'add_another_skill'),
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton(self.get_prompt(session, 'add_another'), callback_data="add_another_skill")],
-                    [InlineKeyboardButton(self.get_prompt(session, 'continue'), callback_data="continue_career")]
-                ])
+                reply_markup=self._choice_kb(session, "add_another_skill", "continue_career")
             )
             return COLLECT_SKILLS
 
@@ -954,68 +1551,55 @@ class CVBot:
         """Handle the user's choice to add another skill or continue"""
         query = update.callback_query
         await query.answer()
+        data = sys.intern(query.data)
         
-        telegram_id = str(query.from_user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = query.message.chat_id
+        telegram_id, session = self._bind_session(update)
         
-        if query.data == "add_another_skill":
-            session['current_field'] = 'skill_skillName'
-            await query.edit_message_text(self.get_prompt(session, 'skill_name'))
+        if data == "add_another_skill":
+            session.current_field = 'skill_skillName'
+            self.queue_edit(query, self.get_prompt(session, 'skill_name'))
             return COLLECT_SKILLS
-        elif query.data == "continue_career":
-            await query.edit_message_text(self.get_prompt(session, 'career_summary'))
+        elif data == "continue_career":
+            self.queue_edit(query, self.get_prompt(session, 'career_summary'))
             return COLLECT_CAREER_OBJECTIVE
 
     async def collect_career_objective(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Collect career objective from candidate"""
-        user = update.effective_user
-        telegram_id = str(user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
+        telegram_id, session = self._bind_session(update)
         
-        if update.message.text.lower() != 'skip':
-            session['careerObjectives'].append({
+        if not _is_skip(update.message.text):
+            session.careerObjectives.append({
                 'summaryText': update.message.text
             })
         
         await update.message.reply_text(self.get_prompt(session, 'certificate_name'))
-        session['current_field'] = 'cert_certificateName'
-        session['current_certification'] = {}
+        session.current_field = 'cert_certificateName'
+        session.current_certification = {}
         return COLLECT_CERTIFICATIONS
 
     async def collect_certifications(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Collect certifications from candidate"""
-        user = update.effective_user
-        telegram_id = str(user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
-        current_field = session['current_field']
+        telegram_id, session = self._bind_session(update)
+        current_field = session.current_field
         
         if current_field == 'cert_certificateName':
-            if update.message.text.lower() == 'skip':
+            if _is_skip(update.message.text):
                 await update.message.reply_text(
                     self.get_prompt(session, 'add_another_cert'),
-                    reply_markup=InlineKeyboardMarkup([
-                        [InlineKeyboardButton(self.get_prompt(session, 'add_another'), callback_data="add_another_cert")],
-                        [InlineKeyboardButton(self.get_prompt(session, 'continue'), callback_data="continue_projects")]
-                    ])
+                    reply_markup=self._choice_kb(session, "add_another_cert", "continue_projects")
                 )
                 return COLLECT_CERTIFICATIONS
-            session['current_certification']['certificateName'] = update.message.text
-            session['current_field'] = 'cert_issuer'
+            session.current_certification['certificateName'] = update.message.text
+            session.current_field = 'cert_issuer'
             await update.message.reply_text(self.get_prompt(session, 'issuer'))
             return COLLECT_CERTIFICATIONS
         elif current_field == 'cert_issuer':
-            session['current_certification']['issuer'] = update.message.text
-            session['certificationsAwards'].append(session['current_certification'].copy())
-            session['current_certification'] = {}
+            session.current_certification['issuer'] = update.message.text
+            session.certificationsAwards.append(session.current_certification)
+            session.current_certification = {}
             await update.message.reply_text(
                 self.get_prompt(session, 'add_another_cert'),
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton(self.get_prompt(session, 'add_another'), callback_data="add_another_cert")],
-                    [InlineKeyboardButton(self.get_prompt(session, 'continue'), callback_data="continue_projects")]
-                ])
+                reply_markup=self._choice_kb(session, "add_another_cert", "continue_projects")
             )
             return COLLECT_CERTIFICATIONS
 
@@ -1023,50 +1607,43 @@ class CVBot:
         """Handle the user's choice to add another certification or continue"""
         query = update.callback_query
         await query.answer()
+        data = sys.intern(query.data)
         
-        telegram_id = str(query.from_user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = query.message.chat_id
+        telegram_id, session = self._bind_session(update)
         
-        if query.data == "add_another_cert":
-            session['current_field'] = 'cert_certificateName'
-            await query.edit_message_text(self.get_prompt(session, 'certificate_name'))
+        if data == "add_another_cert":
+            session.current_field = 'cert_certificateName'
+            self.queue_edit(query, self.get_prompt(session, 'certificate_name'))
             return COLLECT_CERTIFICATIONS
-        elif query.data == "continue_projects":
-            session['current_field'] = 'project_projectTitle'
-            session['current_project'] = {}
-            await query.edit_message_text(self.get_prompt(session, 'project_title'))
+        elif data == "continue_projects":
+            session.current_field = 'project_projectTitle'
+            session.current_project = {}
+            self.queue_edit(query, self.get_prompt(session, 'project_title'))
             return COLLECT_PROJECTS
 
     async def collect_projects(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Collect projects from candidate"""
-        user = update.effective_user
-        telegram_id = str(user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
-        current_field = session['current_field']
+        telegram_id, session = self._bind_session(update)
+        current_field = session.current_field
         
         if current_field == 'project_projectTitle':
-            session['current_project']['projectTitle'] = update.message.text
-            session['current_field'] = 'project_description'
+            session.current_project['projectTitle'] = update.message.text
+            session.current_field = 'project_description'
             await update.message.reply_text(self.get_prompt(session, 'project_description'))
             return COLLECT_PROJECTS
         elif current_field == 'project_description':
-            session['current_project']['description'] = update.message.text
-            session['current_field'] = 'project_projectLink'
+            session.current_project['description'] = update.message.text
+            session.current_field = 'project_projectLink'
             await update.message.reply_text(self.get_prompt(session, 'project_link'))
             return COLLECT_PROJECTS
         elif current_field == 'project_projectLink':
-            if update.message.text.lower() != 'skip':
-                session['current_project']['projectLink'] = update.message.text
-            session['projects'].append(session['current_project'].copy())
-            session['current_project'] = {}
+            if not _is_skip(update.message.text):
+                session.current_project['projectLink'] = update.message.text
+            session.projects.append(session.current_project)
+            session.current_project = {}
             await update.message.reply_text(
                 self.get_prompt(session, 'add_another_project'),
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton(self.get_prompt(session, 'add_another'), callback_data="add_another_project")],
-                    [InlineKeyboardButton(self.get_prompt(session, 'continue'), callback_data="continue_languages")]
-                ])
+                reply_markup=self._choice_kb(session, "add_another_project", "continue_languages")
             )
             return COLLECT_PROJECTS
 
@@ -1074,44 +1651,37 @@ class CVBot:
         """Handle the user's choice to add another project or continue"""
         query = update.callback_query
         await query.answer()
+        data = sys.intern(query.data)
         
-        telegram_id = str(query.from_user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = query.message.chat_id
+        telegram_id, session = self._bind_session(update)
         
-        if query.data == "add_another_project":
-            session['current_field'] = 'project_projectTitle'
-            await query.edit_message_text(self.get_prompt(session, 'project_title'))
+        if data == "add_another_project":
+            session.current_field = 'project_projectTitle'
+            self.queue_edit(query, self.get_prompt(session, 'project_title'))
             return COLLECT_PROJECTS
-        elif query.data == "continue_languages":
-            session['current_field'] = 'lang_languageName'
-            session['current_language'] = {}
-            await query.edit_message_text(self.get_prompt(session, 'language_name'))
+        elif data == "continue_languages":
+            session.current_field = 'lang_languageName'
+            session.current_language = {}
+            self.queue_edit(query, self.get_prompt(session, 'language_name'))
             return COLLECT_LANGUAGES
 
     async def collect_languages(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Collect languages from candidate"""
-        user = update.effective_user
-        telegram_id = str(user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
-        current_field = session['current_field']
+        telegram_id, session = self._bind_session(update)
+        current_field = session.current_field
         
         if current_field == 'lang_languageName':
-            session['current_language']['languageName'] = update.message.text
-            session['current_field'] = 'lang_proficiencyLevel'
+            session.current_language['languageName'] = update.message.text
+            session.current_field = 'lang_proficiencyLevel'
             await update.message.reply_text(self.get_prompt(session, 'language_proficiency'))
             return COLLECT_LANGUAGES
         elif current_field == 'lang_proficiencyLevel':
-            session['current_language']['proficiencyLevel'] = update.message.text
-            session['languages'].append(session['current_language'].copy())
-            session['current_language'] = {}
+            session.current_language['proficiencyLevel'] = update.message.text
+            session.languages.append(session.current_language)
+            session.current_language = {}
             await update.message.reply_text(
                 self.get_prompt(session, 'add_another_language'),
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton(self.get_prompt(session, 'add_another'), callback_data="add_another_language")],
-                    [InlineKeyboardButton(self.get_prompt(session, 'continue'), callback_data="continue_activities")]
-                ])
+                reply_markup=self._choice_kb(session, "add_another_language", "continue_activities")
             )
             return COLLECT_LANGUAGES
 
@@ -1119,127 +1689,138 @@ class CVBot:
         """Handle the user's choice to add another language or continue"""
         query = update.callback_query
         await query.answer()
+        data = sys.intern(query.data)
         
-        telegram_id = str(query.from_user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = query.message.chat_id
+        telegram_id, session = self._bind_session(update)
         
-        if query.data == "add_another_language":
-            session['current_field'] = 'lang_languageName'
-            await query.edit_message_text(self.get_prompt(session, 'language_name'))
+        if data == "add_another_language":
+            session.current_field = 'lang_languageName'
+            self.queue_edit(query, self.get_prompt(session, 'language_name'))
             return COLLECT_LANGUAGES
-        elif query.data == "continue_activities":
-            await query.edit_message_text(self.get_prompt(session, 'activities'))
+        elif data == "continue_activities":
+            self.queue_edit(query, self.get_prompt(session, 'activities'))
             return COLLECT_ACTIVITIES
 
     async def collect_activities(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Collect other activities from candidate"""
-        user = update.effective_user
-        telegram_id = str(user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
+        telegram_id, session = self._bind_session(update)
         
-        if update.message.text.lower() != 'skip':
-            session['otherActivities'].append({
+        if not _is_skip(update.message.text):
+            session.otherActivities.append({
                 'activityType': 'Other',
                 'description': update.message.text
             })
         
-        summary = self.get_prompt(session, 'summary_header')
-        summary += f"{self.get_prompt(session, 'summary_name')}: {session['candidate_data'].get('firstName', '')} {session['candidate_data'].get('middleName', '')} {session['candidate_data'].get('lastName', '')}\n"
-        
-        summary += f"{self.get_prompt(session, 'summary_contact')}: {session['candidate_data'].get('phoneNumber', '')} | {session['candidate_data'].get('emailAddress', '')}\n"
-        summary += f"{self.get_prompt(session, 'summary_location')}: {session['candidate_data'].get('city', '')}, {session['candidate_data'].get('country', '')}\n"
-        summary += f"{self.get_prompt(session, 'summary_availability')}: {session['candidate_data'].get('availability', 'To be specified')}\n\n"
-        
-        summary += f"{self.get_prompt(session, 'summary_work')}:\n"
-        for exp in session['workExperiences']:
-            summary += f"- {exp.get('jobTitle', 'N/A')} at {exp.get('companyName', 'N/A')}, {exp.get('location', 'N/A')}\n"
-            summary += f"  {self.get_prompt(session, 'summary_responsibilities')}: {exp.get('description', 'N/A')}\n"
-        
-        summary += f"\n{self.get_prompt(session, 'summary_education')}:\n"
-        for edu in session['education']:
-            summary += f"- {edu.get('degreeName', 'N/A')} from {edu.get('institutionName', 'N/A')}\n"
-            summary += f"  {self.get_prompt(session, 'summary_gpa')}: {edu.get('gpa', 'N/A')}\n"
-            summary += f"  {self.get_prompt(session, 'summary_edu_description')}: {edu.get('description', 'N/A')}\n"
-            summary += f"  {self.get_prompt(session, 'summary_achievements')}: {edu.get('achievementsHonors', 'None')}\n"
-        
-        if session['skills']:
-            summary += f"\n{self.get_prompt(session, 'summary_skills')}:\n"
-            for skill in session['skills']:
-                summary += f"- {skill.get('skillName', 'N/A')} ({self.get_prompt(session, 'summary_proficiency')}: {skill.get('proficiency', 'N/A')})\n"
-        
-        summary += f"\n{self.get_prompt(session, 'summary_certifications')}:\n"
-        for cert in session['certificationsAwards']:
-            summary += f"- {cert.get('certificateName', 'N/A')} from {cert.get('issuer', 'N/A')}\n"
-        
-        summary += f"\n{self.get_prompt(session, 'summary_projects')}:\n"
-        for project in session['projects']:
-            summary += f"- {project.get('projectTitle', 'N/A')}\n"
-            summary += f"  {self.get_prompt(session, 'summary_edu_description')}: {project.get('description', 'N/A')}\n"
-            if project.get('projectLink'):
-                summary += f"  {self.get_prompt(session, 'summary_project_link')}: {project.get('projectLink')}\n"
-        
-        summary += f"\n{self.get_prompt(session, 'summary_languages')}:\n"
-        for lang in session['languages']:
-            summary += f"- {lang.get('languageName', 'N/A')} ({self.get_prompt(session, 'summary_proficiency')}: {lang.get('proficiencyLevel', 'N/A')})\n"
-        
-        keyboard = [
-            [
-                InlineKeyboardButton(self.get_prompt(session, 'confirm'), callback_data="confirm_yes"),
-                InlineKeyboardButton(self.get_prompt(session, 'edit'), callback_data="edit_no")
-            ]
+        # Build the summary as a parts list and join once; += on a string
+        # this size reallocates the whole summary per line
+        cd = session.candidate_data
+        prompts = session.prompts
+        responsibilities_label = prompts['summary_responsibilities']
+        proficiency_label = prompts['summary_proficiency']
+        description_label = prompts['summary_edu_description']
+        gpa_label = prompts['summary_gpa']
+        achievements_label = prompts['summary_achievements']
+        link_label = prompts['summary_project_link']
+
+        parts = [
+            prompts['summary_header'],
+            f"{prompts['summary_name']}: {cd.get('firstName', '')} {cd.get('middleName', '')} {cd.get('lastName', '')}\n",
+            f"{prompts['summary_contact']}: {cd.get('phoneNumber', '')} | {cd.get('emailAddress', '')}\n",
+            f"{prompts['summary_location']}: {cd.get('city', '')}, {cd.get('country', '')}\n",
+            f"{prompts['summary_availability']}: {cd.get('availability', 'To be specified')}\n\n",
+            f"{prompts['summary_work']}:\n",
         ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        append = parts.append
+        extend = parts.extend
+        extend(
+            f"- {exp.get('jobTitle', 'N/A')} at {exp.get('companyName', 'N/A')}, {exp.get('location', 'N/A')}\n"
+            f"  {responsibilities_label}: {exp.get('description', 'N/A')}\n"
+            for exp in session.workExperiences
+        )
+        append(f"\n{prompts['summary_education']}:\n")
+        extend(
+            f"- {edu.get('degreeName', 'N/A')} from {edu.get('institutionName', 'N/A')}\n"
+            f"  {gpa_label}: {edu.get('gpa', 'N/A')}\n"
+            f"  {description_label}: {edu.get('description', 'N/A')}\n"
+            f"  {achievements_label}: {edu.get('achievementsHonors', 'None')}\n"
+            for edu in session.education
+        )
+        if session.skills:
+            append(f"\n{prompts['summary_skills']}:\n")
+            extend(
+                f"- {skill.get('skillName', 'N/A')} ({proficiency_label}: {skill.get('proficiency', 'N/A')})\n"
+                for skill in session.skills
+            )
+        append(f"\n{prompts['summary_certifications']}:\n")
+        extend(
+            f"- {cert.get('certificateName', 'N/A')} from {cert.get('issuer', 'N/A')}\n"
+            for cert in session.certificationsAwards
+        )
+        append(f"\n{prompts['summary_projects']}:\n")
+        for project in session.projects:
+            append(
+                f"- {project.get('projectTitle', 'N/A')}\n"
+                f"  {description_label}: {project.get('description', 'N/A')}\n"
+            )
+            if project.get('projectLink'):
+                append(f"  {link_label}: {project.get('projectLink')}\n")
+        append(f"\n{prompts['summary_languages']}:\n")
+        extend(
+            f"- {lang.get('languageName', 'N/A')} ({proficiency_label}: {lang.get('proficiencyLevel', 'N/A')})\n"
+            for lang in session.languages
+        )
+        summary = ''.join(parts)
+
+        reply_markup = self._confirm_kb(session)
         
         # Store the summary message ID for later deletion
         summary_message = await update.message.reply_text(
             text=summary,
             reply_markup=reply_markup
         )
-        session['summary_message_id'] = summary_message.message_id
+        session.summary_message_id = summary_message.message_id
         return CONFIRM_ORDER
 
     async def confirm_order(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Handle order confirmation"""
         query = update.callback_query
         await query.answer()
+        data = sys.intern(query.data)
         
-        telegram_id = str(query.from_user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = query.message.chat_id
+        telegram_id, session = self._bind_session(update)
         
-        if query.data == "confirm_yes":
+        if data == "confirm_yes":
             # Send "Saving..." message and store its ID
             saving_message = await query.message.reply_text("Saving...")
-            session['saving_message_id'] = saving_message.message_id
+            session.saving_message_id = saving_message.message_id
             
             # Delete the summary message
             try:
                 if 'summary_message_id' in session:
                     await context.bot.delete_message(
-                        chat_id=session['chat_id'],
-                        message_id=session['summary_message_id']
+                        chat_id=session.chat_id,
+                        message_id=session.summary_message_id
                     )
-                    del session['summary_message_id']
-                    logger.info(f"Deleted summary message for user {telegram_id}")
+                    session.summary_message_id = None
+                    logger.info("Deleted summary message for user %s", telegram_id)
             except Exception as e:
-                logger.error(f"Error deleting summary message for user {telegram_id}: {str(e)}")
+                logger.error("Error deleting summary message for user %s: %s", telegram_id, str(e))
             
-            candidate = Candidate.get_by_telegram_user_id(telegram_id)
+            candidate = await self._db_call(Candidate.get_by_telegram_user_id, str(telegram_id))
+            was_new = candidate is None
             if not candidate:
                 candidate = Candidate(
-                    uid=str(uuid.uuid4()),
-                    telegramUserId=telegram_id,
-                    **session['candidate_data']
+                    uid=uuid.uuid4().hex,
+                    telegramUserId=str(telegram_id),
+                    **session.candidate_data
                 )
-                candidate.save()
-                logger.info(f"Created new candidate {candidate.uid} for telegram_id {telegram_id}")
+                await self._db_call(candidate.save)
+                logger.info("Created new candidate %s for telegram_id %s", candidate.uid, telegram_id)
             else:
-                for key, value in session['candidate_data'].items():
+                for key, value in session.candidate_data.items():
                     setattr(candidate, key, value)
-                candidate.save()
-                logger.info(f"Updated candidate {candidate.uid} for telegram_id {telegram_id}")
+                await self._db_call(candidate.save)
+                logger.info("Updated candidate %s for telegram_id %s", candidate.uid, telegram_id)
             
             # Clear existing subcollections for the candidate to avoid duplicates
             subcollection_models = {
@@ -1252,235 +1833,143 @@ class CVBot:
                 'languages': Language,
                 'otherActivities': OtherActivity
             }
-            for collection_name, model in subcollection_models.items():
-                collection_ref = db.collection('candidates').document(candidate.uid).collection(collection_name)
-                docs = collection_ref.stream()
-                for doc in docs:
-                    doc.reference.delete()
-                logger.info(f"Cleared {collection_name} for candidate {candidate.uid}")
-            
-            # Save subcollection data with explicit candidate_uid
-            for work_exp in session['workExperiences']:
-                work_exp['candidate_uid'] = candidate.uid
-                WorkExperience(**work_exp).save()
-                logger.info(f"Saved WorkExperience for candidate {candidate.uid}: {work_exp.get('jobTitle')}")
-            
-            for edu in session['education']:
-                edu['candidate_uid'] = candidate.uid
-                Education(**edu).save()
-                logger.info(f"Saved Education for candidate {candidate.uid}: {edu.get('degreeName')}")
-            
-            for skill in session['skills']:
-                skill['candidate_uid'] = candidate.uid
-                Skill(**skill).save()
-                logger.info(f"Saved Skill for candidate {candidate.uid}: {skill.get('skillName')}")
-            
-            for career_obj in session['careerObjectives']:
-                career_obj['candidate_uid'] = candidate.uid
-                CareerObjective(**career_obj).save()
-                logger.info(f"Saved CareerObjective for candidate {candidate.uid}: {career_obj.get('summaryText')[:50]}...")
-            
-            for cert in session['certificationsAwards']:
-                cert['candidate_uid'] = candidate.uid
-                CertificationAward(**cert).save()
-                logger.info(f"Saved CertificationAward for candidate {candidate.uid}: {cert.get('certificateName')}")
-            
-            for project in session['projects']:
-                project['candidate_uid'] = candidate.uid
-                Project(**project).save()
-                logger.info(f"Saved Project for candidate {candidate.uid}: {project.get('projectTitle')}")
-            
-            for lang in session['languages']:
-                lang['candidate_uid'] = candidate.uid
-                Language(**lang).save()
-                logger.info(f"Saved Language for candidate {candidate.uid}: {lang.get('languageName')}")
-            
-            for activity in session['otherActivities']:
-                activity['candidate_uid'] = candidate.uid
-                OtherActivity(**activity).save()
-                logger.info(f"Saved OtherActivity for candidate {candidate.uid}: {activity.get('description')[:50]}...")
+            # A freshly created candidate has nothing to clear; skip the
+            # eight listing RPCs entirely. For returning candidates,
+            # list_documents returns bare references (no payload fetch), the
+            # listings overlap on the executor and the deletes share
+            # WriteBatches instead of one RPC per doc
+            if not was_new:
+                candidate_doc = db.collection('candidates').document(candidate.uid)
+                loop = asyncio.get_running_loop()
+
+                def _list_refs(name):
+                    return list(candidate_doc.collection(name).list_documents())
+
+                def _batched_delete(refs):
+                    batch = db.batch()
+                    op_count = 0
+                    for doc_ref in refs:
+                        batch.delete(doc_ref)
+                        op_count += 1
+                        if op_count >= BATCH_MAX_OPS:
+                            commit_batch_with_retry(batch)
+                            batch = db.batch()
+                            op_count = 0
+                    if op_count:
+                        commit_batch_with_retry(batch)
+
+                ref_lists = await asyncio.gather(*(
+                    loop.run_in_executor(self.db_executor, _list_refs, name)
+                    for name in subcollection_models
+                ))
+                stale_refs = [ref for refs in ref_lists for ref in refs]
+                if stale_refs:
+                    await loop.run_in_executor(self.db_executor, _batched_delete, stale_refs)
+                logger.info("Cleared %d stale subcollection docs for candidate %s in batched deletes",
+                            len(stale_refs), candidate.uid)
             
+            # Save all subcollection data in batched writes instead of one
+            # round-trip per document
+            # CandidateManager's constructor fetches the candidate doc, so it
+            # belongs on the executor too
+            manager = await self._db_call(CandidateManager, candidate.uid)
+            await self._db_call(manager.save_profile, {name: session[name] for name in subcollection_models})
+            logger.info("Saved subcollections for candidate %s in batched writes", candidate.uid)
+
             order = Order(
-                id=str(uuid.uuid4()),
+                id=uuid.uuid4().hex,
                 candidateId=candidate.uid,
-                telegramUserId=telegram_id,
+                telegramUserId=str(telegram_id),
                 status="awaiting_payment"
             )
-            order.save()
-            logger.info(f"Created Order {order.id} for candidate {candidate.uid}")
-            
-            session['order_id'] = order.id
-            session['notified'] = False
+            await self._db_call(order.save)
+            logger.info("Created Order %s for candidate %s", order.id, candidate.uid)
             
+            session.order_id = order.id
+            session.payment_phase = PaymentPhase.INITIAL
+            await self._persist_session(telegram_id, session)
+
             # Delete the "Saving..." message
             try:
                 await context.bot.delete_message(
-                    chat_id=session['chat_id'],
-                    message_id=session['saving_message_id']
+                    chat_id=session.chat_id,
+                    message_id=session.saving_message_id
                 )
-                del session['saving_message_id']
-                logger.info(f"Deleted saving message for user {telegram_id}")
+                session.saving_message_id = None
+                logger.info("Deleted saving message for user %s", telegram_id)
             except Exception as e:
-                logger.error(f"Error deleting saving message for user {telegram_id}: {str(e)}")
+                logger.error("Error deleting saving message for user %s: %s", telegram_id, str(e))
 
-            # In confirm_order method when transitioning to PAYMENT
-            session['from_main_flow'] = True
-            
             # Send payment instructions
             await context.bot.send_message(
-                chat_id=session['chat_id'],
+                chat_id=session.chat_id,
                 text=self.get_prompt(session, 'payment_instructions'),
                 parse_mode="HTML"
             )
             return PAYMENT
-        elif query.data == "edit_no":
-            logger.info(f"Edit button clicked by user {telegram_id}, restarting data entry from first name")
+        elif data == "edit_no":
+            logger.info("Edit button clicked by user %s, restarting data entry from first name", telegram_id)
             # Reset session data but preserve language and chat_id
-            self.user_sessions[telegram_id] = {
-                'language': session['language'],
-                'chat_id': session['chat_id'],
-                'candidate_data': {'availability': 'To be specified'},
-                'careerObjectives': [],
-                'skills': [],
-                'education': [],
-                'languages': [],
-                'workExperiences': [],
-                'certificationsAwards': [],
-                'otherActivities': [],
-                'projects': [],
-                'current_field': 'firstName',
-                'current_work_experience': {},
-                'current_education': {},
-                'current_skill': {},
-                'current_certification': {},
-                'current_project': {},
-                'current_language': {}
-            }
-            await query.edit_message_text(self.get_prompt(self.user_sessions[telegram_id], 'first_name'))
+            session.reset(language=session.language, chat_id=session.chat_id, current_field='firstName')
+            self.queue_edit(query, self.get_prompt(session, 'first_name'))
             return COLLECT_PERSONAL_INFO
 
     async def edit_info(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Handle request to edit specific sections of information"""
         query = update.callback_query
         await query.answer()
+        data = sys.intern(query.data)
         
-        telegram_id = str(query.from_user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = query.message.chat_id
+        telegram_id, session = self._bind_session(update)
         
-        logger.info(f"Edit section selected by user {telegram_id}: {query.data}")
+        logger.info("Edit section selected by user %s: %s", telegram_id, query.data)
         
-        if query.data == "edit_no":
-            logger.info(f"Edit button clicked by user {telegram_id}, restarting data entry from first name")
+        if data == "edit_no":
+            logger.info("Edit button clicked by user %s, restarting data entry from first name", telegram_id)
             # Reset session data but preserve language and chat_id
-            self.user_sessions[telegram_id] = {
-                'language': session['language'],
-                'chat_id': session['chat_id'],
-                'candidate_data': {'availability': 'To be specified'},
-                'careerObjectives': [],
-                'skills': [],
-                'education': [],
-                'languages': [],
-                'workExperiences': [],
-                'certificationsAwards': [],
-                'otherActivities': [],
-                'projects': [],
-                'current_field': 'firstName',
-                'current_work_experience': {},
-                'current_education': {},
-                'current_skill': {},
-                'current_certification': {},
-                'current_project': {},
-                'current_language': {}
-            }
-            await query.edit_message_text(self.get_prompt(self.user_sessions[telegram_id], 'first_name'))
-            return COLLECT_PERSONAL_INFO
-        elif query.data == "edit_personal":
-            session['current_field'] = 'firstName'
-            await query.edit_message_text(self.get_prompt(session, 'first_name'))
+            session.reset(language=session.language, chat_id=session.chat_id, current_field='firstName')
+            self.queue_edit(query, self.get_prompt(session, 'first_name'))
             return COLLECT_PERSONAL_INFO
-        elif query.data == "edit_contact":
-            session['current_field'] = 'phoneNumber'
-            await query.edit_message_text(self.get_prompt(session, 'phone_number'))
-            return COLLECT_CONTACT_INFO
-        elif query.data == "edit_profile_image":
-            session['current_field'] = None
-            await query.edit_message_text(self.get_prompt(session, 'profile_image_prompt'))
-            return COLLECT_PROFILE_IMAGE
-        elif query.data == "edit_work":
-            session['workExperiences'] = []
-            session['current_field'] = 'work_jobTitle'
-            await query.edit_message_text(self.get_prompt(session, 'job_title'))
-            return COLLECT_PROFESSIONAL_INFO
-        elif query.data == "edit_education":
-            session['education'] = []
-            session['current_field'] = 'edu_degreeName'
-            session['current_education'] = {}
-            await query.edit_message_text(self.get_prompt(session, 'degree_name'))
-            return COLLECT_EDUCATION
-        elif query.data == "edit_skills":
-            session['skills'] = []
-            session['current_field'] = 'skill_skillName'
-            session['current_skill'] = {}
-            await query.edit_message_text(self.get_prompt(session, 'skill_name'))
-            return COLLECT_SKILLS
-        elif query.data == "edit_career":
-            session['careerObjectives'] = []
-            await query.edit_message_text(self.get_prompt(session, 'career_summary'))
-            return COLLECT_CAREER_OBJECTIVE
-        elif query.data == "edit_certs":
-            session['certificationsAwards'] = []
-            session['current_field'] = 'cert_certificateName'
-            session['current_certification'] = {}
-            await query.edit_message_text(self.get_prompt(session, 'certificate_name'))
-            return COLLECT_CERTIFICATIONS
-        elif query.data == "edit_projects":
-            session['projects'] = []
-            session['current_field'] = 'project_projectTitle'
-            session['current_project'] = {}
-            await query.edit_message_text(self.get_prompt(session, 'project_title'))
-            return COLLECT_PROJECTS
-        elif query.data == "edit_languages":
-            session['languages'] = []
-            session['current_field'] = 'lang_languageName'
-            session['current_language'] = {}
-            await query.edit_message_text(self.get_prompt(session, 'language_name'))
-            return COLLECT_LANGUAGES
-        elif query.data == "edit_activities":
-            session['otherActivities'] = []
-            await query.edit_message_text(self.get_prompt(session, 'activities'))
-            return COLLECT_ACTIVITIES
+
+        spec = EDIT_DISPATCH.get(data)
+        if spec is None:
+            return None
+        list_attr, current_field, dict_attr, prompt_key, next_state = spec
+        if list_attr:
+            setattr(session, list_attr, [])
+        if current_field is not _KEEP:
+            session.current_field = current_field
+        if dict_attr:
+            setattr(session, dict_attr, {})
+        self.queue_edit(query, self.get_prompt(session, prompt_key))
+        return next_state
 
     async def handle_payment_screenshot(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Handle payment screenshot upload"""
-        telegram_id = str(update.effective_user.id)
+        telegram_id = update.effective_user.id
         session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
+        session.chat_id = update.effective_chat.id
         
-        max_size = 5 * 1024 * 1024
-        allowed_mime_types = ['image/jpeg', 'image/png', 'application/pdf']
-        allowed_extensions = ['jpg', 'jpeg', 'png', 'pdf']
         
         try:
-            user = update.effective_user
-            user_info = f"👤 User: {user.first_name or ''} {user.last_name or ''}".strip()
-            if user.username:
-                user_info += f" (@{user.username})"
-            user_info += f"\n🆔 User ID: {telegram_id}"
-            user_info += f"\n📋 Order ID: {session.get('order_id', 'N/A')}"
-            
-            # Load candidate data for phone number if not in session
-            if 'candidate_data' not in session or not session['candidate_data'].get('phoneNumber'):
-                candidate = Candidate.get_by_telegram_user_id(telegram_id)
-                if candidate:
-                    session['candidate_data'] = candidate.to_dict()
-            
-            user_info += f"\n📞 Phone: {session.get('candidate_data', {}).get('phoneNumber', 'N/A')}"
+            # Only the phone number is needed for the caption; a projection
+            # query pulls that one field instead of the whole candidate doc
+            if 'candidate_data' not in session or not session.candidate_data.get('phoneNumber'):
+                phone = await self._db_call(Candidate.get_phone_by_telegram_id, str(telegram_id))
+                if phone:
+                    session.candidate_data['phoneNumber'] = phone
+
+            # One f-string instead of incremental += assembly
+            user_info = (
+                f"{self._format_user_caption(update.effective_user, telegram_id)}"
+                f"\n📋 Order ID: {session.get('order_id', 'N/A')}"
+                f"\n📞 Phone: {session.candidate_data.get('phoneNumber', 'N/A')}"
+            )
             
             keyboard = [
                 [
-                    InlineKeyboardButton("✅ Approve", callback_data=f"approve_{telegram_id}_{session['order_id']}"),
-                    InlineKeyboardButton("❌ Reject", callback_data=f"reject_{telegram_id}_{session['order_id']}")
+                    InlineKeyboardButton("✅ Approve", callback_data=f"approve_{telegram_id}_{session.order_id}"),
+                    InlineKeyboardButton("❌ Reject", callback_data=f"reject_{telegram_id}_{session.order_id}")
                 ]
             ]
             reply_markup = InlineKeyboardMarkup(keyboard)
@@ -1488,13 +1977,13 @@ class CVBot:
             if update.message.photo:
                 photo = update.message.photo[-1]
                 file = await photo.get_file()
-                if file.file_size > max_size:
+                if file.file_size > self._MAX_FILE_SIZE:
                     await update.message.reply_text(self.get_prompt(session, 'file_too_large'))
                     return PAYMENT
                 file_url = file.file_path
                 
                 # Check if this is a retry (not from main flow)
-                retry_text = " (RETRY)" if session.get('order_id') and not session.get('from_main_flow', False) else ""
+                retry_text = " (RETRY)" if session.payment_phase == PaymentPhase.RETRY else ""
                 
                 await context.bot.send_photo(
                     chat_id=private_channel_id,
@@ -1502,26 +1991,26 @@ class CVBot:
                     caption=f"💳 Payment Screenshot Received{retry_text}\n\n{user_info}",
                     reply_markup=reply_markup
                 )
-                logger.info(f"Payment screenshot forwarded to private channel for user {telegram_id}, order {session['order_id']}")
+                logger.info("Payment screenshot forwarded to private channel for user %s, order %s", telegram_id, session.order_id)
                 
             elif update.message.document:
                 document = update.message.document
-                if document.file_size > max_size:
+                if document.file_size > self._MAX_FILE_SIZE:
                     await update.message.reply_text(self.get_prompt(session, 'file_too_large'))
                     return PAYMENT
-                if document.mime_type not in allowed_mime_types:
+                if document.mime_type not in self._ALLOWED_MIME:
                     await update.message.reply_text(self.get_prompt(session, 'invalid_file_type'))
                     return PAYMENT
                 if document.file_name:
-                    extension = document.file_name.split('.')[-1].lower()
-                    if extension not in allowed_extensions:
+                    extension = document.file_name.rpartition('.')[2].lower()
+                    if extension not in self._ALLOWED_EXT:
                         await update.message.reply_text(self.get_prompt(session, 'invalid_file_type'))
                         return PAYMENT
                 file = await document.get_file()
                 file_url = file.file_path
                 
                 # Check if this is a retry (not from main flow)
-                retry_text = " (RETRY)" if session.get('order_id') and not session.get('from_main_flow', False) else ""
+                retry_text = " (RETRY)" if session.payment_phase == PaymentPhase.RETRY else ""
                 
                 await context.bot.send_document(
                     chat_id=private_channel_id,
@@ -1529,28 +2018,28 @@ class CVBot:
                     caption=f"💳 Payment Document Received{retry_text}\n\n{user_info}",
                     reply_markup=reply_markup
                 )
-                logger.info(f"Payment document forwarded to private channel for user {telegram_id}, order {session['order_id']}")
+                logger.info("Payment document forwarded to private channel for user %s, order %s", telegram_id, session.order_id)
             else:
                 await update.message.reply_text(self.get_prompt(session, 'payment_instructions'), parse_mode="HTML")
                 return PAYMENT
             
-            order = Order.get_by_id(session['order_id'])
+            order = await self._db_call(Order.get_by_id, session.order_id)
             if not order:
-                logger.error(f"Order {session['order_id']} not found for telegram_id {telegram_id}")
+                logger.error("Order %s not found for telegram_id %s", session.order_id, telegram_id)
                 await update.message.reply_text(self.get_prompt(session, 'error_message'))
                 return PAYMENT
             
             # Update order with new payment screenshot
             order.paymentScreenshotUrl = file_url
             order.update_status("pending_verification", status_details="Payment screenshot submitted, awaiting admin verification")
-            order.save()
+            await self._db_call(order.save)
             
             await update.message.reply_text(self.get_prompt(session, 'payment_confirmation'))
             
             return ConversationHandler.END
             
         except Exception as e:
-            logger.error(f"Error in handle_payment_screenshot: {str(e)}")
+            logger.error("Error in handle_payment_screenshot: %s", str(e))
             await update.message.reply_text(self.get_prompt(session, 'error_message'))
             return PAYMENT
 
@@ -1560,75 +2049,89 @@ class CVBot:
         await query.answer()
         
         try:
-            action, telegram_id, order_id = query.data.split('_', 2)
-            
-            session = self.get_user_session(telegram_id)
+            # Dispatch on the known prefixes before allocating a split list;
+            # a single slice pulls out the telegram_id/order_id suffix
+            cd = query.data
+            if cd.startswith('approve_'):
+                action, rest = 'approve', cd[8:]
+            elif cd.startswith('reject_'):
+                action, rest = 'reject', cd[7:]
+            else:
+                raise ValueError(f"Unknown admin action: {cd}")
+            telegram_id, order_id = rest.split('_', 1)
+            telegram_id = int(telegram_id)
+
+            session = await self._get_session_restoring(telegram_id)
             if 'chat_id' not in session:
-                logger.error(f"No chat_id found for telegram_id {telegram_id} in session")
+                logger.error("No chat_id found for telegram_id %s in session", telegram_id)
                 await query.message.reply_text("Error: User session not found.")
                 return
             
-            order = Order.get_by_id(order_id)
+            order = await self._db_call(Order.get_by_id, order_id)
             if not order:
-                logger.error(f"Order {order_id} not found for telegram_id {telegram_id}")
+                logger.error("Order %s not found for telegram_id %s", order_id, telegram_id)
                 await query.message.reply_text("Error: Order not found.")
                 return
             
             if action == "approve":
-                try:
-                    order.approve_payment()
-                    await context.bot.send_message(
-                        chat_id=session['chat_id'],
-                        text=self.get_prompt(session, 'payment_verified')
-                    )
-                    await query.edit_message_caption(
-                        caption=f"{query.message.caption}\n\n✅ **APPROVED** by {query.from_user.first_name or 'Admin'}",
-                        reply_markup=None
-                    )
-                    logger.info(f"Payment approved for user {telegram_id}, order {order_id} by admin {query.from_user.id}")
-                    session['notified'] = True
-                except Exception as e:
-                    logger.error(f"Error sending approval message to user {telegram_id}: {str(e)}")
-                    await query.edit_message_caption(
-                        caption=f"{query.message.caption}\n\n✅ **APPROVED** by {query.from_user.first_name or 'Admin'} (Error sending notification to user)",
-                        reply_markup=None
-                    )
+                status_call = order.approve_payment
+                user_text = self.get_prompt(session, 'payment_verified')
+                verdict = f"✅ **APPROVED** by {query.from_user.first_name or 'Admin'}"
+                phase = PaymentPhase.APPROVED
             elif action == "reject":
-                try:
-                    reason = "No reason provided"
-                    order.reject_payment(reason)
-                    await context.bot.send_message(
-                        chat_id=session['chat_id'],
-                        text=self.get_prompt(session, 'payment_rejected').format(reason=reason)
-                    )
-                    await query.edit_message_caption(
-                        caption=f"{query.message.caption}\n\n❌ **REJECTED** by {query.from_user.first_name or 'Admin'}",
-                        reply_markup=None
-                    )
-                    logger.info(f"Payment rejected for user {telegram_id}, order {order_id} by admin {query.from_user.id}")
-                    session['notified'] = True
-                except Exception as e:
-                    logger.error(f"Error sending rejection message to user {telegram_id}: {str(e)}")
-                    await query.edit_message_caption(
-                        caption=f"{query.message.caption}\n\n❌ **REJECTED** by {query.from_user.first_name or 'Admin'} (Error sending notification to user)",
-                        reply_markup=None
-                    )
+                reason = "No reason provided"
+                status_call = lambda: order.reject_payment(reason)
+                user_text = self.get_prompt(session, 'payment_rejected').format(reason=reason)
+                verdict = f"❌ **REJECTED** by {query.from_user.first_name or 'Admin'}"
+                phase = PaymentPhase.REJECTED
+            else:
+                return
+
+            # Mark the phase before the status write: the order listener
+            # fires on that write and must not queue a second notification.
+            # Roll back if the write or the user send fails.
+            prev_phase = session.payment_phase
+            session.payment_phase = phase
+            try:
+                await self._db_call(status_call)
+            except Exception:
+                session.payment_phase = prev_phase
+                raise
+
+            # The user notification and the admin-channel caption edit are
+            # independent network calls; run them concurrently
+            sent, edited = await asyncio.gather(
+                context.bot.send_message(chat_id=session.chat_id, text=user_text),
+                query.edit_message_caption(
+                    caption=f"{query.message.caption}\n\n{verdict}",
+                    reply_markup=None
+                ),
+                return_exceptions=True
+            )
+            if isinstance(sent, Exception):
+                session.payment_phase = prev_phase
+                logger.error("Error sending %s message to user %s: %s", action, telegram_id, str(sent))
+                await query.edit_message_caption(
+                    caption=f"{query.message.caption}\n\n{verdict} (Error sending notification to user)",
+                    reply_markup=None
+                )
+            else:
+                logger.info("Payment %s for user %s, order %s by admin %s", action, telegram_id, order_id, query.from_user.id)
+            if isinstance(edited, Exception) and not isinstance(sent, Exception):
+                logger.error("Error editing admin caption for order %s: %s", order_id, str(edited))
         except ValueError:
-            logger.error(f"Invalid callback data format: {query.data}")
+            logger.error("Invalid callback data format: %s", query.data)
             await query.edit_message_caption(
                 caption=f"{query.message.caption}\n\n⚠️ **ERROR**: Invalid callback data",
                 reply_markup=None
             )
         except Exception as e:
-            logger.error(f"Error handling admin response: {str(e)}")
+            logger.error("Error handling admin response: %s", str(e))
             await query.message.reply_text("An error occurred while processing your response.")
 
     async def payment_retry_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Handle /payment command for retrying rejected payments"""
-        user = update.effective_user
-        telegram_id = str(user.id)
-        session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
+        telegram_id, session = self._bind_session(update)
         
         # Check if user has a rejected order
         rejected_order = self.get_rejected_order_for_user(telegram_id)
@@ -1640,10 +2143,10 @@ class CVBot:
             return ConversationHandler.END
         
         # Set up session for payment retry
-        session['order_id'] = rejected_order.id
-        session['notified'] = False  # Reset notification flag
-        session['from_main_flow'] = False  # Mark this as a retry, not from main flow
-        
+        session.order_id = rejected_order.id
+        session.payment_phase = PaymentPhase.RETRY
+        await self._persist_session(telegram_id, session)
+
         # Send payment retry instructions
         await update.message.reply_text(
             self.get_prompt(session, 'payment_retry_instructions'),
@@ -1654,47 +2157,49 @@ class CVBot:
 
     async def handle_payment_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Handle /payment command for retrying rejected payments"""
-        logger.info(f"🔄 /payment command received from user {update.effective_user.id}")
+        logger.info("🔄 /payment command received from user %s", update.effective_user.id)
         user = update.effective_user
-        telegram_id = str(user.id)
+        telegram_id = user.id
         
-        logger.info(f"🔄 /payment command triggered by user {telegram_id}")
+        logger.info("🔄 /payment command triggered by user %s", telegram_id)
         
         # Get or create session
         session = self.get_user_session(telegram_id)
-        session['chat_id'] = update.effective_chat.id
+        session.chat_id = update.effective_chat.id
         
-        logger.info(f"📋 Session retrieved for user {telegram_id}, checking for rejected orders...")
+        logger.info("📋 Session retrieved for user %s, checking for rejected orders...", telegram_id)
         
         # Check if user has a rejected order
         rejected_order = self.get_rejected_order_for_user(telegram_id)
         
         if not rejected_order:
-            logger.info(f"❌ No rejected order found for user {telegram_id}")
+            logger.info("❌ No rejected order found for user %s", telegram_id)
             await update.message.reply_text(
                 self.get_prompt(session, 'no_rejected_payment')
             )
             return ConversationHandler.END
         
-        logger.info(f"✅ Found rejected order {rejected_order.id} for user {telegram_id}")
+        logger.info("✅ Found rejected order %s for user %s", rejected_order.id, telegram_id)
         
-        # Load candidate data for this user if not in session
-        try:
-            candidate = Candidate.get_by_telegram_user_id(telegram_id)
-            if candidate:
-                session['candidate_data'] = candidate.to_dict()
-                logger.info(f"📊 Loaded candidate data for user {telegram_id}")
-            else:
-                logger.warning(f"⚠️ No candidate found for telegram_id {telegram_id}")
-        except Exception as e:
-            logger.error(f"❌ Error loading candidate data for user {telegram_id}: {str(e)}")
+        # Only the phone number is used downstream (payment caption); fetch
+        # it with a projection instead of the whole candidate doc
+        if not session.candidate_data.get('phoneNumber'):
+            try:
+                phone = await self._db_call(Candidate.get_phone_by_telegram_id, str(telegram_id))
+                if phone:
+                    session.candidate_data['phoneNumber'] = phone
+                    logger.info("📊 Loaded candidate phone for user %s", telegram_id)
+                else:
+                    logger.warning("⚠️ No candidate found for telegram_id %s", telegram_id)
+            except Exception as e:
+                logger.error("❌ Error loading candidate phone for user %s: %s", telegram_id, str(e))
         
         # Set up session for payment retry
-        session['order_id'] = rejected_order.id
-        session['notified'] = False  # Reset notification flag
-        session['from_main_flow'] = False  # Mark this as a retry, not from main flow
-        
-        logger.info(f"🔄 Set up payment retry session for user {telegram_id}, order {rejected_order.id}")
+        session.order_id = rejected_order.id
+        session.payment_phase = PaymentPhase.RETRY
+        await self._persist_session(telegram_id, session)
+
+        logger.info("🔄 Set up payment retry session for user %s, order %s", telegram_id, rejected_order.id)
         
         # Send payment retry instructions
         await update.message.reply_text(
@@ -1702,57 +2207,40 @@ class CVBot:
             parse_mode="HTML"
         )
         
-        logger.info(f"📤 Sent payment retry instructions to user {telegram_id}")
+        logger.info("📤 Sent payment retry instructions to user %s", telegram_id)
         
         return PAYMENT
 
     # Improved get_rejected_order_for_user method with better error handling:
 
-    def get_rejected_order_for_user(self, telegram_id: str):
+    def get_rejected_order_for_user(self, telegram_id: int):
         """Get the most recent rejected order for a user"""
         try:
-            logger.info(f"🔍 Searching for rejected orders for user {telegram_id}")
-            
-            # Query Firebase for rejected orders for this user
-            orders_ref = db.collection('orders')
-            query = orders_ref.where('telegramUserId', '==', telegram_id).where('status', '==', 'rejected')
-            
-            # Get all rejected orders and sort them by created_at in Python
-            orders = list(query.stream())
-            logger.info(f"📊 Found {len(orders)} total rejected orders for user {telegram_id}")
-            
-            if not orders:
-                logger.info(f"❌ No rejected orders found for user {telegram_id}")
+            logger.info("🔍 Searching for rejected orders for user %s", telegram_id)
+
+            # Let Firestore pick the newest order server-side instead of
+            # streaming every rejected order and sorting in Python
+            query = (db.collection('orders')
+                     .where('telegramUserId', '==', str(telegram_id))
+                     .where('status', '==', 'rejected')
+                     .order_by('createdAt', direction=firestore.Query.DESCENDING)
+                     .limit(1))
+            docs = list(query.stream())
+
+            if not docs:
+                logger.info("❌ No rejected orders found for user %s", telegram_id)
                 return None
-            
-            # Sort by createdAt or updated_at (fallback to document creation time)
-            def get_order_time(order_doc):
-                data = order_doc.to_dict()
-                created_at = data.get('createdAt') or data.get('created_at')
-                if isinstance(created_at, str):
-                    try:
-                        return datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    except:
-                        pass
-                elif hasattr(created_at, 'timestamp'):  # Firestore timestamp
-                    return created_at
-                return order_doc.create_time  # Fallback to document creation time
-            
-            # Sort orders by time (most recent first)
-            orders.sort(key=get_order_time, reverse=True)
-            
-            # Get the most recent order
-            most_recent_order_doc = orders[0]
-            order_data = most_recent_order_doc.to_dict()
-            order_data['id'] = most_recent_order_doc.id
-            
-            logger.info(f"✅ Found most recent rejected order {order_data['id']} for user {telegram_id}")
-            
+
+            order_data = docs[0].to_dict()
+            order_data['id'] = docs[0].id
+
+            logger.info("✅ Found most recent rejected order %s for user %s", order_data['id'], telegram_id)
+
             # Create Order instance from the data
             return Order(**order_data)
             
         except Exception as e:
-            logger.error(f"❌ Error fetching rejected order for user {telegram_id}: {str(e)}")
+            logger.error("❌ Error fetching rejected order for user %s: %s", telegram_id, str(e))
             return None
 
     async def handle_admin_reply(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -1761,13 +2249,19 @@ class CVBot:
             logger.debug("Ignoring update with no message or chat_id")
             return
         
-        if str(update.message.chat_id) != private_channel_id:
-            logger.debug(f"Ignoring message from chat_id {update.message.chat_id}, expected {private_channel_id}")
+        if update.message.chat_id != PRIVATE_CHANNEL_ID_INT:
+            logger.debug("Ignoring message from chat_id %s, expected %s", update.message.chat_id, private_channel_id)
             return
         
-        reply_text = update.message.text.lower() if update.message.text else ""
-        if not (reply_text.startswith('approve') or reply_text.startswith('reject:')):
-            logger.debug(f"Ignoring reply with text: {reply_text}")
+        # First-character test rejects ordinary channel chatter before
+        # paying for the lowercase copy and prefix walk
+        text = update.message.text or ""
+        if text[:1] not in ('a', 'r', 'A', 'R'):
+            logger.debug("Ignoring reply with text: %s", text)
+            return
+        reply_text = text.lower()
+        if not reply_text.startswith(('approve', 'reject:')):
+            logger.debug("Ignoring reply with text: %s", reply_text)
             return
         
         try:
@@ -1776,82 +2270,102 @@ class CVBot:
                 return
             
             caption = update.message.reply_to_message.caption
-            if not caption.startswith('💳 Payment'):
-                logger.debug(f"Ignoring reply with invalid caption: {caption}")
+            if not caption or caption[0] != '💳' or not caption.startswith('💳 Payment'):
+                logger.debug("Ignoring reply with invalid caption: %s", caption)
                 return
             
-            try:
-                order_id = caption.split('Order ID: ')[1].split('\n')[0].strip()
-            except IndexError:
-                logger.error(f"Failed to parse order_id from caption: {caption}")
+            # partition returns a fixed 3-tuple (no throwaway lists) and
+            # makes the missing-needle case an explicit branch instead of
+            # an IndexError
+            _, sep, rest = caption.partition('Order ID: ')
+            if not sep:
+                logger.error("Failed to parse order_id from caption: %s", caption)
                 return
+            order_id = rest.partition('\n')[0].strip()
             
-            order = Order.get_by_id(order_id)
+            order = await self._db_call(Order.get_by_id, order_id)
             if not order:
-                logger.error(f"Order {order_id} not found")
+                logger.error("Order %s not found", order_id)
                 return
             
-            telegram_id = order.telegramUserId
-            session = self.get_user_session(telegram_id)
+            telegram_id = int(order.telegramUserId)
+            session = await self._get_session_restoring(telegram_id)
             if 'chat_id' not in session:
-                logger.error(f"No chat_id found for telegram_id {telegram_id} in session")
+                logger.error("No chat_id found for telegram_id %s in session", telegram_id)
                 return
             
             if reply_text == 'approve':
-                order.approve_payment()
-                logger.info(f"Order {order_id} approved: paymentVerified={order.paymentVerified}, status={order.status}, statusDetails={order.statusDetails}")
-                if not session.get('notified', False):
-                    await self.application.bot.send_message(
-                        chat_id=session['chat_id'],
-                        text=self.get_prompt(session, 'payment_verified')
-                    )
-                    logger.info(f"Sent immediate payment verified notification to chat_id {session['chat_id']} for order {order_id}")
-                    session['notified'] = True
-            elif reply_text.startswith('reject:'):
-                reason = reply_text[7:].strip() or 'No reason provided'
-                order.reject_payment(reason)
-                logger.info(f"Order {order_id} rejected: paymentVerified={order.paymentVerified}, status={order.status}, statusDetails={order.statusDetails}")
-                if not session.get('notified', False):
-                    await self.application.bot.send_message(
-                        chat_id=session['chat_id'],
-                        text=self.get_prompt(session, 'payment_rejected').format(reason=reason)
+                status_call = order.approve_payment
+                prompt = self.get_prompt(session, 'payment_verified')
+                phase = PaymentPhase.APPROVED
+                verdict = 'approved'
+            elif (remainder := reply_text.removeprefix('reject:')) != reply_text:
+                reason = remainder.strip() or 'No reason provided'
+                status_call = lambda: order.reject_payment(reason)
+                prompt = self.get_prompt(session, 'payment_rejected').format_map({'reason': reason})
+                phase = PaymentPhase.REJECTED
+                verdict = 'rejected'
+            else:
+                return
+
+            if session.payment_phase < PaymentPhase.APPROVED:
+                # The Firestore status write and the Telegram notification
+                # are independent; overlap them. Mark the phase before the
+                # gather so a concurrent handler can't double-notify, and
+                # roll back if either call fails.
+                prev_phase = session.payment_phase
+                session.payment_phase = phase
+                try:
+                    await asyncio.gather(
+                        self._db_call(status_call),
+                        self.application.bot.send_message(chat_id=session.chat_id, text=prompt)
                     )
-                    logger.info(f"Sent immediate payment rejected notification to chat_id {session['chat_id']} for order {order_id}")
-                    session['notified'] = True
+                except Exception:
+                    session.payment_phase = prev_phase
+                    raise
+                logger.info("Sent immediate payment %s notification to chat_id %s for order %s", verdict, session.chat_id, order_id)
+            else:
+                await self._db_call(status_call)
+            logger.info("Order %s %s: paymentVerified=%s, status=%s, statusDetails=%s", order_id, verdict, order.paymentVerified, order.status, order.statusDetails)
         
         except Exception as e:
-            logger.error(f"Error in handle_admin_reply: {str(e)}")
+            logger.error("Error in handle_admin_reply: %s", str(e))
 
     async def ignore_non_reply_messages(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Ignore non-reply messages in the private channel"""
-        logger.debug(f"Ignoring non-reply message in private channel: {update.message.text if update.message.text else 'No text'}")
+        logger.debug("Ignoring non-reply message in private channel: %s", update.message.text if update.message.text else 'No text')
 
     async def cancel(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Cancel the current conversation"""
-        telegram_id = str(update.effective_user.id)
+        telegram_id = update.effective_user.id
         session = self.get_user_session(telegram_id)
         
-        # Delete the previous menu message if it exists
-        if 'menu_message_id' in session:
+        # Delete the previous menu message if it exists. pop clears the
+        # stale ID even when the delete fails, so later cancels don't keep
+        # retrying a dead message
+        menu_message_id = session.pop('menu_message_id')
+        if menu_message_id:
             try:
                 await context.bot.delete_message(
-                    chat_id=session['chat_id'],
-                    message_id=session['menu_message_id']
+                    chat_id=session.chat_id,
+                    message_id=menu_message_id
                 )
-                logger.info(f"Deleted menu message ID {session['menu_message_id']} for user {telegram_id} on cancel")
-                del session['menu_message_id']
+                logger.info("Deleted menu message ID %s for user %s on cancel", menu_message_id, telegram_id)
             except Exception as e:
-                logger.warning(f"Failed to delete menu message ID {session['menu_message_id']} for user {telegram_id} on cancel: {str(e)}")
+                logger.warning("Failed to delete menu message ID %s for user %s on cancel: %s", menu_message_id, telegram_id, str(e))
         
-        if telegram_id in self.user_sessions:
-            del self.user_sessions[telegram_id]
-        
-        await update.message.reply_text(self.get_prompt(session, 'cancel_message'))
+        cancel_text = self.get_prompt(session, 'cancel_message')
+        # Drop the session without recycling it: with concurrent updates an
+        # in-flight handler may still hold a reference, and handing the
+        # object to another user would let those stale writes cross over
+        self.user_sessions.pop(telegram_id, None)
+
+        await update.message.reply_text(cancel_text)
         return ConversationHandler.END
 
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Send a help message"""
-        telegram_id = str(update.effective_user.id)
+        telegram_id = update.effective_user.id
         session = self.get_user_session(telegram_id)
         await update.message.reply_text(self.get_prompt(session, 'help_message'))
 
@@ -1860,7 +2374,7 @@ class CVBot:
         logger.error(msg="Exception while handling update:", exc_info=context.error)
         
         if update and update.effective_message and update.effective_user:
-            telegram_id = str(update.effective_user.id)
+            telegram_id = update.effective_user.id
             session = self.get_user_session(telegram_id)
             await update.effective_message.reply_text(self.get_prompt(session, 'error_message'))
         else:
@@ -1868,46 +2382,38 @@ class CVBot:
 
     def run(self):
         """Start the bot with retry logic"""
-        max_retries = 3
-        retry_delay = 5.0
+        max_retries = 5
         for attempt in range(max_retries):
             try:
                 logger.info("Initializing Application")
                 self.application.initialize()  # Explicitly initialize the application
                 logger.info("Starting Telegram bot with polling")
+                # Long-poll: Telegram holds the getUpdates connection open up
+                # to 30s, so idle bots make ~30x fewer requests and new
+                # messages arrive without the old 1s latency floor
                 self.application.run_polling(
-                    poll_interval=1.0,
-                    timeout=10,
+                    poll_interval=0.0,
+                    timeout=30,
                     bootstrap_retries=3,
                     close_loop=False
                 )
                 return
             except telegram.error.TimedOut as e:
-                logger.error(f"Telegram API connection timed out (attempt {attempt + 1}/{max_retries}): {str(e)}")
+                logger.error("Telegram API connection timed out (attempt %s/%s): %s", attempt + 1, max_retries, str(e))
                 if attempt < max_retries - 1:
-                    logger.info(f"Retrying in {retry_delay} seconds...")
-                    import time
-                    time.sleep(retry_delay)
+                    # Exponential backoff with jitter so a flapping API
+                    # isn't hammered on a fixed cadence
+                    delay = min(30.0, 5.0 * (2 ** attempt)) + random.uniform(0, 1.0)
+                    logger.info(f"Retrying in {delay:.1f} seconds...")
+                    time.sleep(delay)
                 else:
                     logger.error("Max retries reached. Failed to connect to Telegram API.")
-                    raise
+                    raise RuntimeError("Telegram unreachable") from e
             except Exception as e:
-                logger.error(f"Error running bot: {str(e)}")
+                logger.error("Error running bot: %s", str(e))
                 raise
 
-flask_app = Flask(__name__)
-
-@flask_app.route('/')
-def index():
-    return 'Bot is alive!', 200
-
-def run_flask():
-    port = int(os.environ.get("PORT", 5000))
-    flask_app.run(host="0.0.0.0", port=port)
-
 if __name__ == "__main__":
-    threading.Thread(target=run_flask).start()
-
-    # Start the Telegram bot
+    # Start the Telegram bot; the health endpoint runs on the same loop
     bot = CVBot(telegram_bot_token)
     bot.application.run_polling()
\ No newline at end of file
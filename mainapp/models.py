@@ -8,8 +8,44 @@ from firebase_admin import firestore, credentials
 from datetime import datetime, timedelta
 import uuid
 from google.cloud.firestore_v1 import FieldFilter
+from google.api_core import exceptions as gapi_exceptions
 from datetime import datetime
 from typing import Dict, Any, Optional
+import asyncio
+import json
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Firestore caps batched writes at 500 mutations / ~10 MiB per commit;
+# flush a little early so a single oversized document can't tip us over.
+BATCH_MAX_OPS = 450
+BATCH_MAX_BYTES = 9 * 1024 * 1024
+
+
+if orjson is not None:
+    def _payload_size(data: Dict[str, Any]) -> int:
+        """Approximate a document's wire size; orjson emits bytes directly"""
+        return len(orjson.dumps(data, default=str))
+else:
+    def _payload_size(data: Dict[str, Any]) -> int:
+        return len(json.dumps(data, default=str))
+
+
+def commit_batch_with_retry(batch, max_retries: int = 3):
+    """Commit a WriteBatch, retrying on transient Aborted errors"""
+    for attempt in range(max_retries):
+        try:
+            batch.commit()
+            return
+        except gapi_exceptions.Aborted:
+            if attempt == max_retries - 1:
+                raise
+            time.sleep(0.1 * (2 ** attempt))
 
 
 class BaseFirestoreModel:
@@ -52,6 +88,35 @@ class BaseFirestoreModel:
         if missing:
             raise ValueError(f"Missing required fields: {', '.join(missing)}")
 
+    @classmethod
+    def bulk_save(cls, items: List[Dict[str, Any]], candidate_uid: str):
+        """Save many subcollection items in shared WriteBatch commits.
+
+        One batch commit per BATCH_MAX_OPS documents instead of one RPC
+        per item. Only valid on models that define COLLECTION.
+        """
+        if not items:
+            return []
+        db = firestore.client()
+        parent_ref = db.collection('candidates').document(candidate_uid).collection(cls.COLLECTION)
+        batch = db.batch()
+        op_count = 0
+        saved = []
+        for item in items:
+            obj = cls(**{**item, 'candidate_uid': candidate_uid})
+            if not obj.id:
+                obj.id = uuid.uuid4().hex
+            batch.set(parent_ref.document(obj.id), obj.to_dict())
+            saved.append(obj)
+            op_count += 1
+            if op_count >= BATCH_MAX_OPS:
+                commit_batch_with_retry(batch)
+                batch = db.batch()
+                op_count = 0
+        if op_count:
+            commit_batch_with_retry(batch)
+        return saved
+
 
 class User(BaseFirestoreModel):
     """User model corresponding to 'users' collection"""
@@ -217,7 +282,7 @@ class Template(BaseFirestoreModel):
         """Save template to Firestore"""
         db = firestore.client()
         if not self.id:
-            self.id = str(uuid.uuid4())
+            self.id = uuid.uuid4().hex
         doc_ref = db.collection('templates').document(self.id)
         doc_ref.set(self.to_dict())
         return self
@@ -288,7 +353,7 @@ class Order(BaseFirestoreModel):
         required_fields = ['id', 'candidateId', 'telegramUserId', 'status']
         self.validate_required_fields(required_fields)
         if not self.id:
-            self.id = str(uuid.uuid4())
+            self.id = uuid.uuid4().hex
         self.updated_at = datetime.now()  # Update timestamp
         db = firestore.client()
         doc_ref = db.collection('orders').document(self.id)
@@ -403,7 +468,7 @@ class Candidate(BaseFirestoreModel):
         
         # Ensure we have a UID before saving
         if not self.uid:
-            self.uid = str(uuid.uuid4())  # Generate a new UUID if none exists
+            self.uid = uuid.uuid4().hex  # Generate a new UUID if none exists
         
         doc_ref = db.collection('candidates').document(self.uid)
         doc_ref.set(self.to_dict())
@@ -428,6 +493,19 @@ class Candidate(BaseFirestoreModel):
         for doc in docs:
             return cls.from_dict(doc.to_dict())
         return None
+
+    @classmethod
+    def get_phone_by_telegram_id(cls, telegram_user_id: str):
+        """Get only the candidate's phone number via a field projection"""
+        db = firestore.client()
+        query = (db.collection('candidates')
+                 .where(filter=FieldFilter('telegramUserId', '==', telegram_user_id))
+                 .select(['phoneNumber'])
+                 .limit(1))
+        for doc in query.stream():
+            return doc.to_dict().get('phoneNumber')
+        return None
+
     def get_full_name(self) -> str:
         """Get candidate's full name"""
         parts = [self.firstName, self.middleName, self.lastName]
@@ -438,6 +516,8 @@ class Candidate(BaseFirestoreModel):
 class CareerObjective(BaseFirestoreModel):
     """Career objective subcollection model"""
     
+    COLLECTION = 'careerObjectives'
+    
     def __init__(self, **kwargs):
         self.id = kwargs.get('id', '')
         self.candidate_uid = kwargs.get('candidate_uid', '')
@@ -448,8 +528,8 @@ class CareerObjective(BaseFirestoreModel):
         """Save career objective to Firestore"""
         db = firestore.client()
         if not self.id:
-            self.id = str(uuid.uuid4())
-        doc_ref = db.collection('candidates').document(self.candidate_uid).collection('careerObjectives').document(self.id)
+            self.id = uuid.uuid4().hex
+        doc_ref = db.collection('candidates').document(self.candidate_uid).collection(self.COLLECTION).document(self.id)
         doc_ref.set(self.to_dict())
         return self
     
@@ -457,13 +537,15 @@ class CareerObjective(BaseFirestoreModel):
     def get_by_candidate(cls, candidate_uid: str):
         """Get career objectives for a candidate"""
         db = firestore.client()
-        docs = db.collection('candidates').document(candidate_uid).collection('careerObjectives').stream()
+        docs = db.collection('candidates').document(candidate_uid).collection(cls.COLLECTION).where('candidate_uid', '==', candidate_uid).stream()
         return [cls.from_dict(doc.to_dict()) for doc in docs]
 
 
 class WorkExperience(BaseFirestoreModel):
     """Work experience subcollection model"""
     
+    COLLECTION = 'workExperiences'
+    
     def __init__(self, **kwargs):
         self.id = kwargs.get('id', '')
         self.candidate_uid = kwargs.get('candidate_uid', '')
@@ -479,8 +561,8 @@ class WorkExperience(BaseFirestoreModel):
         """Save work experience to Firestore"""
         db = firestore.client()
         if not self.id:
-            self.id = str(uuid.uuid4())
-        doc_ref = db.collection('candidates').document(self.candidate_uid).collection('workExperiences').document(self.id)
+            self.id = uuid.uuid4().hex
+        doc_ref = db.collection('candidates').document(self.candidate_uid).collection(self.COLLECTION).document(self.id)
         doc_ref.set(self.to_dict())
         return self
     
@@ -488,13 +570,15 @@ class WorkExperience(BaseFirestoreModel):
     def get_by_candidate(cls, candidate_uid: str):
         """Get work experiences for a candidate"""
         db = firestore.client()
-        docs = db.collection('candidates').document(candidate_uid).collection('workExperiences').stream()
+        docs = db.collection('candidates').document(candidate_uid).collection(cls.COLLECTION).where('candidate_uid', '==', candidate_uid).stream()
         return [cls.from_dict(doc.to_dict()) for doc in docs]
 
 
 class Education(BaseFirestoreModel):
     """Education subcollection model"""
     
+    COLLECTION = 'education'
+    
     def __init__(self, **kwargs):
         self.id = kwargs.get('id', '')
         self.candidate_uid = kwargs.get('candidate_uid', '')
@@ -510,8 +594,8 @@ class Education(BaseFirestoreModel):
         """Save education to Firestore"""
         db = firestore.client()
         if not self.id:
-            self.id = str(uuid.uuid4())
-        doc_ref = db.collection('candidates').document(self.candidate_uid).collection('education').document(self.id)
+            self.id = uuid.uuid4().hex
+        doc_ref = db.collection('candidates').document(self.candidate_uid).collection(self.COLLECTION).document(self.id)
         doc_ref.set(self.to_dict())
         return self
     
@@ -519,13 +603,15 @@ class Education(BaseFirestoreModel):
     def get_by_candidate(cls, candidate_uid: str):
         """Get education records for a candidate"""
         db = firestore.client()
-        docs = db.collection('candidates').document(candidate_uid).collection('education').stream()
+        docs = db.collection('candidates').document(candidate_uid).collection(cls.COLLECTION).where('candidate_uid', '==', candidate_uid).stream()
         return [cls.from_dict(doc.to_dict()) for doc in docs]
 
 
 class Skill(BaseFirestoreModel):
     """Skill subcollection model"""
     
+    COLLECTION = 'skills'
+    
     PROFICIENCY_CHOICES = [
         ('Beginner', 'Beginner'),
         ('Intermediate', 'Intermediate'),
@@ -545,8 +631,8 @@ class Skill(BaseFirestoreModel):
         """Save skill to Firestore"""
         db = firestore.client()
         if not self.id:
-            self.id = str(uuid.uuid4())
-        doc_ref = db.collection('candidates').document(self.candidate_uid).collection('skills').document(self.id)
+            self.id = uuid.uuid4().hex
+        doc_ref = db.collection('candidates').document(self.candidate_uid).collection(self.COLLECTION).document(self.id)
         doc_ref.set(self.to_dict())
         return self
     
@@ -554,13 +640,15 @@ class Skill(BaseFirestoreModel):
     def get_by_candidate(cls, candidate_uid: str):
         """Get skills for a candidate"""
         db = firestore.client()
-        docs = db.collection('candidates').document(candidate_uid).collection('skills').stream()
+        docs = db.collection('candidates').document(candidate_uid).collection(cls.COLLECTION).where('candidate_uid', '==', candidate_uid).stream()
         return [cls.from_dict(doc.to_dict()) for doc in docs]
 
 
 class CertificationAward(BaseFirestoreModel):
     """Certification/Award subcollection model"""
     
+    COLLECTION = 'certificationsAwards'
+    
     def __init__(self, **kwargs):
         self.id = kwargs.get('id', '')
         self.candidate_uid = kwargs.get('candidate_uid', '')
@@ -573,8 +661,8 @@ class CertificationAward(BaseFirestoreModel):
         """Save certification/award to Firestore"""
         db = firestore.client()
         if not self.id:
-            self.id = str(uuid.uuid4())
-        doc_ref = db.collection('candidates').document(self.candidate_uid).collection('certificationsAwards').document(self.id)
+            self.id = uuid.uuid4().hex
+        doc_ref = db.collection('candidates').document(self.candidate_uid).collection(self.COLLECTION).document(self.id)
         doc_ref.set(self.to_dict())
         return self
     
@@ -582,13 +670,15 @@ class CertificationAward(BaseFirestoreModel):
     def get_by_candidate(cls, candidate_uid: str):
         """Get certifications/awards for a candidate"""
         db = firestore.client()
-        docs = db.collection('candidates').document(candidate_uid).collection('certificationsAwards').stream()
+        docs = db.collection('candidates').document(candidate_uid).collection(cls.COLLECTION).where('candidate_uid', '==', candidate_uid).stream()
         return [cls.from_dict(doc.to_dict()) for doc in docs]
 
 
 class Project(BaseFirestoreModel):
     """Project subcollection model"""
     
+    COLLECTION = 'projects'
+    
     def __init__(self, **kwargs):
         self.id = kwargs.get('id', '')
         self.candidate_uid = kwargs.get('candidate_uid', '')
@@ -602,8 +692,8 @@ class Project(BaseFirestoreModel):
         """Save project to Firestore"""
         db = firestore.client()
         if not self.id:
-            self.id = str(uuid.uuid4())
-        doc_ref = db.collection('candidates').document(self.candidate_uid).collection('projects').document(self.id)
+            self.id = uuid.uuid4().hex
+        doc_ref = db.collection('candidates').document(self.candidate_uid).collection(self.COLLECTION).document(self.id)
         doc_ref.set(self.to_dict())
         return self
     
@@ -611,13 +701,15 @@ class Project(BaseFirestoreModel):
     def get_by_candidate(cls, candidate_uid: str):
         """Get projects for a candidate"""
         db = firestore.client()
-        docs = db.collection('candidates').document(candidate_uid).collection('projects').stream()
+        docs = db.collection('candidates').document(candidate_uid).collection(cls.COLLECTION).where('candidate_uid', '==', candidate_uid).stream()
         return [cls.from_dict(doc.to_dict()) for doc in docs]
 
 
 class Language(BaseFirestoreModel):
     """Language subcollection model"""
     
+    COLLECTION = 'languages'
+    
     PROFICIENCY_CHOICES = [
         ('Native', 'Native'),
         ('Fluent', 'Fluent'),
@@ -636,8 +728,8 @@ class Language(BaseFirestoreModel):
         """Save language to Firestore"""
         db = firestore.client()
         if not self.id:
-            self.id = str(uuid.uuid4())
-        doc_ref = db.collection('candidates').document(self.candidate_uid).collection('languages').document(self.id)
+            self.id = uuid.uuid4().hex
+        doc_ref = db.collection('candidates').document(self.candidate_uid).collection(self.COLLECTION).document(self.id)
         doc_ref.set(self.to_dict())
         return self
     
@@ -645,13 +737,15 @@ class Language(BaseFirestoreModel):
     def get_by_candidate(cls, candidate_uid: str):
         """Get languages for a candidate"""
         db = firestore.client()
-        docs = db.collection('candidates').document(candidate_uid).collection('languages').stream()
+        docs = db.collection('candidates').document(candidate_uid).collection(cls.COLLECTION).where('candidate_uid', '==', candidate_uid).stream()
         return [cls.from_dict(doc.to_dict()) for doc in docs]
 
 
 class OtherActivity(BaseFirestoreModel):
     """Other activity subcollection model"""
     
+    COLLECTION = 'otherActivities'
+    
     ACTIVITY_TYPES = [
         ('Volunteering', 'Volunteering'),
         ('Extracurricular', 'Extracurricular'),
@@ -670,8 +764,8 @@ class OtherActivity(BaseFirestoreModel):
         """Save other activity to Firestore"""
         db = firestore.client()
         if not self.id:
-            self.id = str(uuid.uuid4())
-        doc_ref = db.collection('candidates').document(self.candidate_uid).collection('otherActivities').document(self.id)
+            self.id = uuid.uuid4().hex
+        doc_ref = db.collection('candidates').document(self.candidate_uid).collection(self.COLLECTION).document(self.id)
         doc_ref.set(self.to_dict())
         return self
     
@@ -679,17 +773,56 @@ class OtherActivity(BaseFirestoreModel):
     def get_by_candidate(cls, candidate_uid: str):
         """Get other activities for a candidate"""
         db = firestore.client()
-        docs = db.collection('candidates').document(candidate_uid).collection('otherActivities').stream()
+        docs = db.collection('candidates').document(candidate_uid).collection(cls.COLLECTION).where('candidate_uid', '==', candidate_uid).stream()
         return [cls.from_dict(doc.to_dict()) for doc in docs]
 
 
 # Helper class for managing candidate data with all subcollections
 class CandidateManager:
     """Helper class to manage candidate data with all subcollections"""
-    
+
+    SUBCOLLECTION_MODELS = {
+        'careerObjectives': CareerObjective,
+        'workExperiences': WorkExperience,
+        'education': Education,
+        'skills': Skill,
+        'certificationsAwards': CertificationAward,
+        'projects': Project,
+        'languages': Language,
+        'otherActivities': OtherActivity,
+    }
+
     def __init__(self, candidate_uid: str):
         self.candidate_uid = candidate_uid
         self.candidate = Candidate.get_by_uid(candidate_uid)
+
+    def save_profile(self, profile: Dict[str, List[Dict[str, Any]]]):
+        """Save all subcollection items in batched Firestore writes.
+
+        Collapses the per-document save round-trips into WriteBatch commits,
+        flushing whenever the batch approaches the 500-op or 10 MiB limit.
+        """
+        db = firestore.client()
+        candidate_ref = db.collection('candidates').document(self.candidate_uid)
+        batch = db.batch()
+        op_count = 0
+        byte_count = 0
+        for collection_name, model in self.SUBCOLLECTION_MODELS.items():
+            for item in profile.get(collection_name, []):
+                obj = model(**{**item, 'candidate_uid': self.candidate_uid})
+                if not obj.id:
+                    obj.id = uuid.uuid4().hex
+                data = obj.to_dict()
+                batch.set(candidate_ref.collection(collection_name).document(obj.id), data)
+                op_count += 1
+                byte_count += _payload_size(data)
+                if op_count >= BATCH_MAX_OPS or byte_count >= BATCH_MAX_BYTES:
+                    commit_batch_with_retry(batch)
+                    batch = db.batch()
+                    op_count = 0
+                    byte_count = 0
+        if op_count:
+            commit_batch_with_retry(batch)
     
     def get_complete_profile(self) -> Dict[str, Any]:
         """Get complete candidate profile with all subcollections"""
@@ -709,7 +842,31 @@ class CandidateManager:
         })
         
         return profile
-    
+
+    def _get_subcollection(self, collection_name: str):
+        """Fetch one subcollection as a list of dicts"""
+        model = self.SUBCOLLECTION_MODELS[collection_name]
+        return collection_name, [obj.to_dict() for obj in model.get_by_candidate(self.candidate_uid)]
+
+    async def get_complete_profile_async(self, executor=None) -> Dict[str, Any]:
+        """Async variant of get_complete_profile.
+
+        Issues all eight subcollection queries concurrently on the given
+        executor, so the wall time is the slowest query instead of the sum
+        of all of them.
+        """
+        if not self.candidate:
+            return {}
+
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(executor, self._get_subcollection, name)
+            for name in self.SUBCOLLECTION_MODELS
+        ))
+        profile = self.candidate.to_dict()
+        profile.update(dict(results))
+        return profile
+
     def update_candidate_timestamp(self):
         """Update candidate's lastUpdatedAt timestamp"""
         if self.candidate:
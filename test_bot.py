@@ -1,9 +1,10 @@
 import logging
 import os
 import re
+import time
 import asyncio
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Final, Optional
 from telegram import Update
 from telegram.ext import (
     MessageHandler,
@@ -13,43 +14,62 @@ from telegram.ext import (
     Application
 )
 import telegram
+from cachetools import TTLCache
 
-# Set up detailed logging
+# Set up logging; raise to DEBUG via LOG_LEVEL for per-update tracing
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     level=logging.INFO
 )
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+
+# Load and validate the channel config once at import (fail fast) instead
+# of re-walking the filesystem for .env on every handler registration
+load_dotenv()
+try:
+    _PRIVATE_CHANNEL_ID: Final[int] = int(os.environ['PRIVATE_CHANNEL_ID'])
+except KeyError:
+    raise ValueError("PRIVATE_CHANNEL_ID not set in .env file") from None
+except ValueError:
+    raise ValueError("PRIVATE_CHANNEL_ID must be a valid integer") from None
+
+# Compiled once: every forwarded message/file runs this, and skipping the
+# re-cache lookup per call is free
+USERNAME_RE = re.compile(r'^@(\w+)\s*(.*)', re.DOTALL)
+
+
+def _clean_username(username: str) -> str:
+    """Normalize a possibly-@-prefixed username to lowercase without the @"""
+    return username[1:].lower() if username.startswith('@') else username.lower()
 
 class TestBot:
     def __init__(self):
         """Initialize TestBot with enhanced logging"""
-        logger.info("🔄 Initializing TestBot instance")
-        self.user_cache = {}
+        logger.info("Initializing TestBot instance")
+        # Bounded: one-time users age out after a day instead of leaking
+        # cache entries for the life of the process
+        self.user_cache = TTLCache(maxsize=10_000, ttl=24 * 3600)
         self.private_channel_id = None
-        logger.info("✅ TestBot instance initialized")
+        self._private_channel_id_int = None
+        # Channel admins change rarely; keep a username -> id map for a
+        # minute so cache misses cost a dict lookup, not an API call
+        self._admin_cache = {}
+        self._admin_cache_ts = 0.0
+        self._admin_refresh_task = None
+        # Caps in-flight file forwards so a burst of uploads doesn't pile
+        # unbounded send_* coroutines against Telegram's rate limits
+        self._send_sem = asyncio.Semaphore(5)
+        logger.info("TestBot instance initialized")
 
     def register_handlers(self, application: Application) -> None:
         """Register all handlers with detailed logging"""
-        logger.info("🔄 Starting handler registration process")
-        
-        load_dotenv()
-        self.private_channel_id = os.getenv('PRIVATE_CHANNEL_ID')
-        
-        if not self.private_channel_id:
-            error_msg = "❌ PRIVATE_CHANNEL_ID not set in .env file"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
+        logger.info("Starting handler registration process")
+
+        self.private_channel_id = _PRIVATE_CHANNEL_ID
+        self._private_channel_id_int = _PRIVATE_CHANNEL_ID
+        logger.info("Valid private channel ID: %s", _PRIVATE_CHANNEL_ID)
 
-        try:
-            channel_id_int = int(self.private_channel_id)
-            logger.info(f"✅ Valid private channel ID: {channel_id_int}")
-        except ValueError:
-            error_msg = "❌ PRIVATE_CHANNEL_ID must be a valid integer"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-        
         application.add_handler(MessageHandler(filters.ALL, self.debug_all_messages), group=-1)
         application.add_handler(CommandHandler("start", self.start_command), group=0)
         application.add_handler(CommandHandler("register", self.register_command), group=0)
@@ -57,11 +77,11 @@ class TestBot:
         # Register handlers
         handlers = [
             MessageHandler(
-                filters.Chat(int(self.private_channel_id)) & (filters.PHOTO | filters.Document.ALL),
+                filters.Chat(self._private_channel_id_int) & (filters.PHOTO | filters.Document.ALL),
                 self.handle_file_upload
             ),
             MessageHandler(
-                filters.Chat(int(self.private_channel_id)) & filters.TEXT & ~filters.COMMAND,
+                filters.Chat(self._private_channel_id_int) & filters.TEXT & ~filters.COMMAND,
                 self.handle_text_message
             ),
             MessageHandler(
@@ -73,23 +93,28 @@ class TestBot:
         for handler in handlers:
             application.add_handler(handler)
         
-        logger.info("✅ All handlers registered successfully")
+        logger.info("All handlers registered successfully")
 
     async def debug_all_messages(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Debug handler to log all messages"""
+        # Runs for every update at group=-1; bail before any log work when
+        # DEBUG output is filtered anyway
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         user = update.effective_user
-        logger.info(f"🔍 DEBUG: Message from user: {user.username if user else 'Unknown'}")
-        logger.info(f"🔍 DEBUG: Message text: {update.message.text if update.message else 'No text'}")
-        logger.info(f"🔍 DEBUG: Chat type: {update.effective_chat.type}")
+        logger.debug("msg from %s: %s (chat=%s)",
+                     user.username if user else None,
+                     update.message.text if update.message else None,
+                     update.effective_chat.type)
 
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /teststart command with enhanced caching"""
-        logger.info("🚨 TESTSTART COMMAND HANDLER TRIGGERED!")
-        logger.info("🔄 /teststart command received")
+        logger.info("TESTSTART COMMAND HANDLER TRIGGERED!")
+        logger.info("/teststart command received")
         user = update.effective_user
         
         if not user:
-            logger.warning("❌ No user associated with /teststart command")
+            logger.warning("No user associated with /teststart command")
             return
 
         try:
@@ -99,7 +124,7 @@ class TestBot:
             
             if username:
                 self._update_caches(username, user_id, context)
-                logger.info(f"✅ User registered via /teststart: @{username} -> {user_id}")
+                logger.info("User registered via /teststart: @%s -> %s", username, user_id)
                 
                 response = (
                     f"👋 Hello @{fresh_user.username}!\n\n"
@@ -111,24 +136,24 @@ class TestBot:
                 
             await update.message.reply_text(response)
         except Exception as e:
-            logger.error(f"❌ Error in /teststart: {str(e)}")
+            logger.error(f"Error in /teststart: {str(e)}")
             await update.message.reply_text("Registration failed. Please try again.")
 
     async def register_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /register command with detailed logging"""
-        logger.info("🚨 REGISTER COMMAND HANDLER TRIGGERED!")
-        logger.info("🔄 /register command received")
+        logger.info("REGISTER COMMAND HANDLER TRIGGERED!")
+        logger.info("/register command received")
         user = update.effective_user
         
         if not user:
-            logger.warning("❌ No user associated with /register command")
+            logger.warning("No user associated with /register command")
             return
 
         if user.username:
             username = user.username.lower()
             user_id = user.id
             self._update_caches(username, user_id, context)
-            logger.info(f"✅ User registered via /register: @{username} -> {user_id}")
+            logger.info("User registered via /register: @%s -> %s", username, user_id)
             
             response = (
                 f"✅ Registration successful!\n\n"
@@ -138,7 +163,7 @@ class TestBot:
             )
             await update.message.reply_text(response)
         else:
-            logger.warning("❌ User has no username set")
+            logger.warning("User has no username set")
             await update.message.reply_text(
                 "❌ Registration failed!\n\n"
                 "Please set a username in your Telegram settings first, then try /register again."
@@ -147,43 +172,45 @@ class TestBot:
     async def cache_user_info(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Cache user information with detailed logging"""
         if not update.effective_user:
-            logger.debug("❌ No effective user in update")
+            logger.debug("No effective user in update")
             return
                 
         if not update.effective_user.username:
-            logger.debug("❌ User has no username to cache")
+            logger.debug("User has no username to cache")
             return
 
         username = update.effective_user.username.lower()
         user_id = update.effective_user.id
         self._update_caches(username, user_id, context)
-        logger.info(f"✅ Cached user info: @{username} -> {user_id}")
+        logger.info("Cached user info: @%s -> %s", username, user_id)
 
-    async def _resolve_with_retry(self, username: str, context: ContextTypes.DEFAULT_TYPE) -> Optional[int]:
-        """Helper method to resolve username with retry logic"""
-        clean_username = username.replace('@', '').lower()
-        
-        logger.info(f"🔍 Checking caches for: {clean_username}")
-        logger.info(f"🔍 Bot cache: {context.bot_data.get('user_cache', {})}")
-        logger.info(f"🔍 Local cache: {self.user_cache}")
+    async def _resolve_with_retry(self, clean_username: str, context: ContextTypes.DEFAULT_TYPE) -> Optional[int]:
+        """Helper method to resolve an already-cleaned username with retry logic"""
+
+        logger.info("Checking caches for: %s", clean_username)
+        # The cache dumps stringify whole dicts; only build them when the
+        # DEBUG level is actually enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Bot cache: {context.bot_data.get('user_cache', {})}")
+            logger.debug(f"Local cache: {self.user_cache}")
         
         # Check bot_data cache first
         if 'user_cache' in context.bot_data and clean_username in context.bot_data['user_cache']:
             user_id = context.bot_data['user_cache'][clean_username]
-            logger.info(f"✅ Found in bot cache: {clean_username} -> {user_id}")
+            logger.info(f"Found in bot cache: {clean_username} -> {user_id}")
             return user_id
         
         # Check local cache
         if clean_username in self.user_cache:
             user_id = self.user_cache[clean_username]
-            logger.info(f"✅ Found in local cache: {clean_username} -> {user_id}")
+            logger.info(f"Found in local cache: {clean_username} -> {user_id}")
             return user_id
         
-        logger.info(f"❌ Not found in caches: {clean_username}")
+        logger.info(f"Not found in caches: {clean_username}")
         
         # Try resolution via get_chat
         try:
-            logger.info(f"🔄 Attempting get_chat for @{clean_username}")
+            logger.info(f"Attempting get_chat for @{clean_username}")
             chat = await asyncio.wait_for(
                 context.bot.get_chat(f"@{clean_username}"),
                 timeout=3.0
@@ -191,39 +218,52 @@ class TestBot:
             if chat.type == 'private':
                 user_id = chat.id
                 self._update_caches(clean_username, user_id, context)
-                logger.info(f"✅ Resolved via get_chat: @{clean_username} -> {user_id}")
+                logger.info(f"Resolved via get_chat: @{clean_username} -> {user_id}")
                 return user_id
         except asyncio.TimeoutError:
-            logger.warning(f"⌛ get_chat timed out for @{clean_username}")
+            logger.warning(f"get_chat timed out for @{clean_username}")
         except telegram.error.BadRequest as e:
-            logger.warning(f"❌ get_chat failed for @{clean_username}: {str(e)}")
+            logger.warning(f"get_chat failed for @{clean_username}: {str(e)}")
         
         # Try resolution via channel admins
         if self.private_channel_id:
             try:
-                logger.info(f"🔄 Checking channel admins for @{clean_username}")
-                admins = await context.bot.get_chat_administrators(self.private_channel_id)
-                for admin in admins:
-                    if admin.user.username and admin.user.username.lower() == f"@{clean_username}".lower():
-                        user_id = admin.user.id
-                        self._update_caches(clean_username, user_id, context)
-                        logger.info(f"✅ Resolved via admins: @{clean_username} -> {user_id}")
-                        return user_id
+                if time.monotonic() - self._admin_cache_ts > 60:
+                    # Share one in-flight get_chat_administrators call: when
+                    # several resolutions hit an expired cache together they
+                    # all await the same future instead of each issuing the
+                    # API call
+                    if self._admin_refresh_task is None or self._admin_refresh_task.done():
+                        logger.info(f"Refreshing channel admin cache for @{clean_username}")
+                        self._admin_refresh_task = asyncio.ensure_future(
+                            context.bot.get_chat_administrators(self.private_channel_id)
+                        )
+                    admins = await self._admin_refresh_task
+                    self._admin_cache = {
+                        admin.user.username.lower(): admin.user.id
+                        for admin in admins if admin.user.username
+                    }
+                    self._admin_cache_ts = time.monotonic()
+                user_id = self._admin_cache.get(clean_username)
+                if user_id:
+                    self._update_caches(clean_username, user_id, context)
+                    logger.info(f"Resolved via admins: @{clean_username} -> {user_id}")
+                    return user_id
             except Exception as e:
-                logger.warning(f"⚠️ Error checking admins for @{clean_username}: {str(e)}")
+                logger.warning(f"Error checking admins for @{clean_username}: {str(e)}")
         
-        logger.warning(f"❌ Could not resolve username @{clean_username}")
+        logger.warning(f"Could not resolve username @{clean_username}")
         return None
 
     async def resolve_username_to_id(self, username: str, context: ContextTypes.DEFAULT_TYPE) -> int:
         """Resolve username to user ID with improved error handling"""
-        clean_username = username.replace('@', '').lower()
+        clean_username = _clean_username(username)
         full_username = f"@{clean_username}"
-        logger.info(f"🔍 Starting username resolution for: {full_username}")
+        logger.info(f"Starting username resolution for: {full_username}")
         
         user_id = await self._resolve_with_retry(clean_username, context)
         if user_id:
-            logger.info(f"✅ Successfully resolved {full_username} to ID: {user_id}")
+            logger.info(f"Successfully resolved {full_username} to ID: {user_id}")
             return user_id
         
         error_msg = (
@@ -238,14 +278,13 @@ class TestBot:
         logger.error(error_msg)
         raise ValueError(error_msg)
 
-    def _update_caches(self, username: str, user_id: int, context: ContextTypes.DEFAULT_TYPE):
-        """Update all caches with resolved user"""
-        clean_username = username.replace('@', '').lower()
+    def _update_caches(self, clean_username: str, user_id: int, context: ContextTypes.DEFAULT_TYPE):
+        """Update all caches with a resolved, already-cleaned username"""
         self.user_cache[clean_username] = user_id
         if 'user_cache' not in context.bot_data:
-            context.bot_data['user_cache'] = {}
+            context.bot_data['user_cache'] = TTLCache(maxsize=10_000, ttl=24 * 3600)
         context.bot_data['user_cache'][clean_username] = user_id
-        logger.info(f"✅ Updated caches for @{clean_username} -> {user_id}")
+        logger.info(f"Updated caches for @{clean_username} -> {user_id}")
 
     async def handle_text_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle text messages with improved error handling"""
@@ -253,26 +292,26 @@ class TestBot:
         
         message = update.message or update.channel_post
         if not message:
-            logger.warning("❌ No message or channel_post in update")
+            logger.warning("No message or channel_post in update")
             return
             
-        logger.info(f"📨 Message received in chat: {message.chat_id}")
+        logger.info("Message received in chat: %s", message.chat_id)
 
-        if str(message.chat_id) != str(self.private_channel_id):
-            logger.warning(f"❌ Message from wrong chat: {message.chat_id}, expected: {self.private_channel_id}")
+        if message.chat_id != self._private_channel_id_int:
+            logger.warning(f"Message from wrong chat: {message.chat_id}, expected: {self.private_channel_id}")
             return
 
         message_text = message.text
         if not message_text:
-            logger.warning("❌ No text content in message")
+            logger.warning("No text content in message")
             await message.reply_text("Please include a username (e.g., @username) and message content.")
             return
 
-        logger.info(f"📝 Message text: {message_text[:100]}...")
+        logger.info("Message text: %.100s...", message_text)
 
-        username_match = re.match(r'^@(\w+)\s*(.*)', message_text, re.DOTALL)
+        username_match = USERNAME_RE.match(message_text)
         if not username_match:
-            logger.warning("❌ Message doesn't start with @username pattern")
+            logger.warning("Message doesn't start with @username pattern")
             await message.reply_text("Please start the message with a username (e.g., @username).")
             return
 
@@ -281,30 +320,30 @@ class TestBot:
         full_username = f"@{username}"
         
         if not remaining_text:
-            logger.warning("❌ No message content after username")
+            logger.warning("No message content after username")
             await message.reply_text(f"Please include message content after {full_username}.")
             return
 
         try:
-            logger.info(f"🔍 Attempting to forward message to {full_username}")
+            logger.info(f"Attempting to forward message to {full_username}")
             target_user_id = await self.resolve_username_to_id(username, context)
             
             await context.bot.send_message(
                 chat_id=target_user_id,
                 text=remaining_text
             )
-            logger.info(f"📤 Message forwarded to user ID: {target_user_id}")
+            logger.info(f"Message forwarded to user ID: {target_user_id}")
             
             await message.reply_text(f"✅ Message sent to {full_username} successfully.")
             
         except ValueError as e:
-            logger.error(f"❌ Username resolution failed: {str(e)}")
+            logger.error(f"Username resolution failed: {str(e)}")
             await message.reply_text(str(e))
         except telegram.error.Forbidden:
-            logger.error(f"❌ Bot blocked by user {full_username}")
+            logger.error(f"Bot blocked by user {full_username}")
             await message.reply_text(f"❌ Failed to send to {full_username}. The user has blocked this bot.")
         except Exception as e:
-            logger.error(f"❌ Unexpected error: {str(e)}")
+            logger.error(f"Unexpected error: {str(e)}")
             await message.reply_text(f"❌ Error sending message: {str(e)}")
 
     async def handle_file_upload(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -313,89 +352,93 @@ class TestBot:
         
         message = update.message or update.channel_post
         if not message:
-            logger.warning("❌ No message or channel_post in update")
+            logger.warning("No message or channel_post in update")
             return
             
-        logger.info(f"📨 File received in chat: {message.chat_id}")
+        logger.info("File received in chat: %s", message.chat_id)
 
-        if str(message.chat_id) != str(self.private_channel_id):
-            logger.warning(f"❌ File from wrong chat: {message.chat_id}, expected: {self.private_channel_id}")
+        if message.chat_id != self._private_channel_id_int:
+            logger.warning(f"File from wrong chat: {message.chat_id}, expected: {self.private_channel_id}")
             return
 
         has_photo = bool(message.photo)
         has_document = bool(message.document)
-        logger.info(f"📂 File type - Photo: {has_photo}, Document: {has_document}")
+        logger.info(f"File type - Photo: {has_photo}, Document: {has_document}")
 
         if not (has_photo or has_document):
-            logger.warning("❌ No valid file attachment")
+            logger.warning("No valid file attachment")
             await message.reply_text("❌ No photo or document found. Please upload a file with the message.")
             return
 
         message_text = message.caption if message.caption else message.text
         if not message_text:
-            logger.warning("❌ No username provided with file")
+            logger.warning("No username provided with file")
             await message.reply_text("Please include a username (e.g., @username) with the file.")
             return
 
-        username_match = re.match(r'^@(\w+)\s*(.*)', message_text, re.DOTALL)
+        username_match = USERNAME_RE.match(message_text)
         if not username_match:
-            fallback_match = re.search(r'@?(\w+)', message_text)
-            if not fallback_match:
-                logger.warning("❌ No valid username found in message")
+            # Fallback: take the first whitespace-delimited token as the
+            # username; plain string ops beat a regex scan here
+            parts = message_text.split(None, 1)
+            username = parts[0].lstrip('@') if parts else ''
+            if not username or not username.replace('_', '').isalnum():
+                logger.warning("No valid username found in message")
                 await message.reply_text("No valid username found. Please include a username (with or without '@').")
                 return
-            username = fallback_match.group(1)
-            caption_content = None
-            logger.info(f"ℹ️ Using fallback username match: @{username}")
+            caption_content = parts[1].strip() if len(parts) > 1 else None
+            logger.info(f"Using fallback username match: @{username}")
         else:
             username = username_match.group(1)
             caption_content = username_match.group(2).strip() if username_match.group(2).strip() else None
-            logger.info(f"ℹ️ Using standard username match: @{username}")
+            logger.info(f"Using standard username match: @{username}")
 
         full_username = f"@{username}"
-        logger.info(f"🔍 Processing file for username: {full_username}")
+        logger.info(f"Processing file for username: {full_username}")
 
         try:
-            logger.info(f"🔄 Resolving username: {full_username}")
+            logger.info(f"Resolving username: {full_username}")
             target_user_id = await self.resolve_username_to_id(username, context)
-            logger.info(f"✅ Resolved {full_username} to ID: {target_user_id}")
+            logger.info(f"Resolved {full_username} to ID: {target_user_id}")
 
             if message.photo:
                 photo = message.photo[-1]
-                logger.info(f"📷 Sending photo to user ID: {target_user_id}")
-                await context.bot.send_photo(
-                    chat_id=target_user_id,
-                    photo=photo.file_id,
-                    caption=caption_content
-                )
+                logger.info(f"Sending photo to user ID: {target_user_id}")
+                async with self._send_sem:
+                    await context.bot.send_photo(
+                        chat_id=target_user_id,
+                        photo=photo.file_id,
+                        caption=caption_content
+                    )
                 file_type = "photo"
             elif message.document:
                 document = message.document
-                logger.info(f"📄 Sending document to user ID: {target_user_id}")
-                await context.bot.send_document(
-                    chat_id=target_user_id,
-                    document=document.file_id,
-                    caption=caption_content
-                )
+                logger.info(f"Sending document to user ID: {target_user_id}")
+                async with self._send_sem:
+                    await context.bot.send_document(
+                        chat_id=target_user_id,
+                        document=document.file_id,
+                        caption=caption_content
+                    )
                 file_type = "document"
             else:
-                logger.error("❌ Unexpected file type")
+                logger.error("Unexpected file type")
                 await message.reply_text("No valid file (photo or document) found.")
                 return
 
-            logger.info(f"✅ {file_type.capitalize()} sent successfully")
+            logger.info(f"{file_type.capitalize()} sent successfully")
             await message.reply_text(
                 f"✅ {file_type.capitalize()} sent to {full_username} successfully."
             )
 
         except ValueError as e:
-            logger.error(f"❌ Username resolution failed: {str(e)}")
+            logger.error(f"Username resolution failed: {str(e)}")
             await message.reply_text(str(e))
         except telegram.error.Forbidden:
-            logger.error(f"❌ Bot blocked by user {full_username}")
+            logger.error(f"Bot blocked by user {full_username}")
             await message.reply_text(
                 f"❌ Failed to send to {full_username}. The user has blocked this bot."
             )
         except Exception as e:
-            logger.error(f"❌ Unexpected error: {str(e)}")
+            logger.error(f"Unexpected error: {str(e)}")
             await message.reply_text(f"❌ Error sending file: {str(e)}")
\ No newline at end of file
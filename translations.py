@@ -1,3 +1,7 @@
+from types import MappingProxyType
+
+# Read-only views keep the prompt tables safe to share across sessions
+# and let lookups skip dict-versioning invalidation
 PROMPTS = {
     'en': {
         'welcome':"Welcome to the CV Producer bot!",
@@ -211,3 +215,5 @@ PROMPTS = {
         'samples_sent': '✅ የሲቪ ናሙናዎች ተልከዋል። እነዚህን እንደ ማጣቀሻ ተጠቅመው የራስዎን ሲቪ መፍጠር ይችላሉ።',
     }
 }
+
+PROMPTS = {lang: MappingProxyType(table) for lang, table in PROMPTS.items()}